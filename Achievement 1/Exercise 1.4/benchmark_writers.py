@@ -0,0 +1,90 @@
+# Exercise 1.4: Concurrent Writer Benchmark
+# Starts several processes that add recipes to one recipe log at the same
+# time, optionally while another process keeps compacting it, then checks
+# that every recipe made it into the file and reports the write throughput.
+#
+# Usage:
+#     python benchmark_writers.py --writers 4 --recipes 500 --sync-every 1 10 50
+#     python benchmark_writers.py --writers 8 --compact
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+from recipe_log import RecipeLogWriter, compact, create_log, log_stats
+
+
+def write_recipes(filename, writer_id, count, sync_every, start_event):
+    """Add count recipes with names unique to this writer."""
+    start_event.wait()
+    with RecipeLogWriter(filename, sync_every=sync_every) as writer:
+        for i in range(count):
+            writer.add({
+                'name': f"Writer {writer_id} Recipe {i}",
+                'cooking_time': 5 + i % 60,
+                'ingredients': ['flour', 'eggs', f'spice {i % 20}'],
+                'difficulty': 'Intermediate',
+            })
+
+
+def keep_compacting(filename, stop_event, start_event):
+    """Compact the log over and over until told to stop."""
+    start_event.wait()
+    while not stop_event.is_set():
+        compact(filename)
+
+
+def run(filename, writers, recipes, sync_every, with_compaction):
+    """
+    Run one benchmark round on a fresh log.
+
+    Returns:
+        tuple: (seconds taken, recipes found in the log afterwards)
+    """
+    create_log(filename)
+    start_event = multiprocessing.Event()
+    stop_event = multiprocessing.Event()
+    processes = [
+        multiprocessing.Process(target=write_recipes, args=(filename, writer_id, recipes, sync_every, start_event))
+        for writer_id in range(writers)
+    ]
+    compactor = None
+    if with_compaction:
+        compactor = multiprocessing.Process(target=keep_compacting, args=(filename, stop_event, start_event))
+        compactor.start()
+    for process in processes:
+        process.start()
+
+    started = time.perf_counter()
+    start_event.set()
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - started
+
+    if compactor:
+        stop_event.set()
+        compactor.join()
+    _, found, _ = log_stats(filename)
+    return elapsed, found
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure recipe log write throughput with concurrent writers.")
+    parser.add_argument('--writers', type=int, default=4, help="Number of writer processes (default: 4)")
+    parser.add_argument('--recipes', type=int, default=500, help="Recipes added by each writer (default: 500)")
+    parser.add_argument('--sync-every', type=int, nargs='+', default=[1, 10, 50],
+                        help="Batch sizes to compare: recipes per locked append and fsync (default: 1 10 50)")
+    parser.add_argument('--compact', action='store_true', help="Keep compacting the log while the writers run")
+    args = parser.parse_args()
+
+    expected = args.writers * args.recipes
+    print(f"{args.writers} writers x {args.recipes} recipes{' with continuous compaction' if args.compact else ''}")
+    print(f"{'sync every':>10} | {'seconds':>8} | {'recipes/s':>10} | result")
+    print("-" * 50)
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'benchmark_recipes.bin')
+        for sync_every in args.sync_every:
+            elapsed, found = run(filename, args.writers, args.recipes, sync_every, args.compact)
+            result = "all saved" if found == expected else f"LOST {expected - found}"
+            print(f"{sync_every:>10} | {elapsed:>8.2f} | {expected / elapsed:>10,.0f} | {result}")
@@ -0,0 +1,308 @@
+# Exercise 1.4: Recipe Log Index
+# An on-disk index next to a recipe log (my_recipes.bin -> my_recipes.bin.idx)
+# that maps each ingredient to the offsets of the recipes using it.
+#
+# recipe_search.py opens the index and the log with mmap: listing ingredients
+# reads only the index, and a search reads only the matching records, so
+# neither depends on how many recipes the log holds.
+#
+#   header:  magic b'RECIPIDX' | version | reserved | log ID | log bytes indexed
+#            | offset and length of the ingredient table | offset and length of the recipe table
+#   table:   one fixed-size entry per key, sorted by key:
+#            name offset | name length | offsets offset | number of offsets
+#   blobs:   UTF-8 names and big-endian 8-byte record offsets
+#
+# The ingredient table lists every ingredient of the current recipes; the
+# recipe table lists every current recipe key with the offset of its record.
+# Records appended to the log after the index was built (the "tail") are
+# read directly, and the index is rebuilt once the tail grows past
+# INDEX_MAX_TAIL bytes or the log has been replaced by a compaction (its
+# header then holds a new log ID).
+#
+# Usage:
+#     python recipe_index.py my_recipes.bin    (rebuild the index)
+import mmap
+import os
+import pickle
+import struct
+import sys
+import zlib
+
+from recipe_log import HEADER, RECORD, RecipeLogError, iter_records, read_header, recipe_key
+
+INDEX_MAGIC = b'RECIPIDX'
+INDEX_VERSION = 1
+INDEX_HEADER = struct.Struct('>8sHHQQQIQI')
+INDEX_ENTRY = struct.Struct('>QIQI')
+OFFSET = struct.Struct('>Q')
+
+# Rebuild the index when this many bytes of records have been appended since
+INDEX_MAX_TAIL = 256 * 1024
+
+
+def index_filename(log_filename):
+    """Return the path of the index belonging to a recipe log."""
+    return f"{log_filename}.idx"
+
+
+def ingredient_key(ingredient):
+    """Return the key ingredients are matched by: trimmed and case-folded."""
+    return " ".join(ingredient.split()).casefold()
+
+
+def pack_table(entries, start):
+    """
+    Serialize a sorted list of (name, offsets) pairs as a table followed by its blobs.
+
+    Args:
+        entries (list): (name, list of record offsets) pairs, sorted by key
+        start (int): Position of the table in the index file
+
+    Returns:
+        bytes: The table, the names and the offsets
+    """
+    names = [name.encode('utf-8') for name, _ in entries]
+    name_position = start + INDEX_ENTRY.size * len(entries)
+    offsets_position = name_position + sum(len(name) for name in names)
+
+    table = []
+    for name, (_, offsets) in zip(names, entries):
+        table.append(INDEX_ENTRY.pack(name_position, len(name), offsets_position, len(offsets)))
+        name_position += len(name)
+        offsets_position += OFFSET.size * len(offsets)
+    blob = b"".join(b"".join(OFFSET.pack(offset) for offset in offsets) for _, offsets in entries)
+    return b"".join(table) + b"".join(names) + blob
+
+
+def read_log_id(log_filename):
+    """Return the ID in the header of a recipe log, which changes whenever the log is replaced."""
+    with open(log_filename, 'rb') as file:
+        return read_header(file)[2]
+
+
+def build_index(log_filename):
+    """
+    Build the index for a recipe log from scratch.
+
+    Covers the records present when the first pass starts; the index is
+    written to a temporary name and renamed into place. If the log is
+    compacted (replaced) while it is being read, the build starts over.
+
+    Returns:
+        int: Number of ingredients indexed
+    """
+    while True:
+        log_id = read_log_id(log_filename)
+        # First pass: where the latest record of each recipe is
+        latest = {}
+        indexed_size = HEADER.size
+        for offset, size, recipe in iter_records(log_filename):
+            latest[recipe_key(recipe)] = offset
+            indexed_size = offset + size
+
+        # Second pass: which of those records use each ingredient
+        live = set(latest.values())
+        ingredients = {}
+        for offset, _, recipe in iter_records(log_filename):
+            if offset >= indexed_size:
+                break
+            if offset not in live:
+                continue
+            for ingredient in recipe['ingredients']:
+                key = ingredient_key(ingredient)
+                if key:
+                    name, offsets = ingredients.setdefault(key, (ingredient.strip(), []))
+                    if not offsets or offsets[-1] != offset:
+                        offsets.append(offset)
+
+        if read_log_id(log_filename) == log_id:
+            break
+
+    ingredient_entries = [ingredients[key] for key in sorted(ingredients)]
+    recipe_entries = [(key, [latest[key]]) for key in sorted(latest)]
+    ingredient_table = pack_table(ingredient_entries, INDEX_HEADER.size)
+    recipe_start = INDEX_HEADER.size + len(ingredient_table)
+    recipe_table = pack_table(recipe_entries, recipe_start)
+
+    filename = index_filename(log_filename)
+    temp_name = f"{filename}.{os.getpid()}.tmp"
+    with open(temp_name, 'wb') as file:
+        file.write(INDEX_HEADER.pack(
+            INDEX_MAGIC, INDEX_VERSION, 0, log_id, indexed_size,
+            INDEX_HEADER.size, len(ingredient_entries), recipe_start, len(recipe_entries),
+        ))
+        file.write(ingredient_table)
+        file.write(recipe_table)
+    os.replace(temp_name, filename)
+    return len(ingredient_entries)
+
+
+def index_is_current(log_filename):
+    """
+    Check whether the index exists, belongs to this log and is not too far behind it.
+
+    Only reads the index header and the log header.
+    """
+    try:
+        with open(index_filename(log_filename), 'rb') as file:
+            header = file.read(INDEX_HEADER.size)
+    except FileNotFoundError:
+        return False
+    if len(header) < INDEX_HEADER.size:
+        return False
+    magic, version, _, log_id, indexed_size = INDEX_HEADER.unpack(header)[:5]
+    with open(log_filename, 'rb') as file:
+        current_id = read_header(file)[2]
+        size = os.fstat(file.fileno()).st_size
+    return (
+        magic == INDEX_MAGIC and version == INDEX_VERSION and log_id == current_id
+        and indexed_size <= size <= indexed_size + INDEX_MAX_TAIL
+    )
+
+
+class IndexTable:
+    """Read access to one table of the index, straight from the memory map."""
+
+    def __init__(self, index, start, count, key=lambda name: name):
+        self.index = index
+        self.start = start
+        self.count = count
+        self.key = key
+
+    def __len__(self):
+        return self.count
+
+    def name(self, position):
+        """Return the name stored at a position in the table."""
+        name_offset, name_length, _, _ = INDEX_ENTRY.unpack_from(self.index, self.start + position * INDEX_ENTRY.size)
+        return self.index[name_offset:name_offset + name_length].decode('utf-8')
+
+    def offsets(self, position):
+        """Return the record offsets stored at a position in the table."""
+        _, _, offsets_offset, count = INDEX_ENTRY.unpack_from(self.index, self.start + position * INDEX_ENTRY.size)
+        return struct.unpack_from(f'>{count}Q', self.index, offsets_offset)
+
+    def find(self, key):
+        """Binary search for a key; returns its position or None."""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self.key(self.name(middle)) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count and self.key(self.name(low)) == key:
+            return low
+        return None
+
+
+class RecipeIndex:
+    """
+    A recipe log opened for searching through its index.
+
+    Use open_index() to get one; close it (or use it in a with block) when done.
+    """
+
+    def __init__(self, log_filename):
+        self.log_filename = log_filename
+        self.index_file = open(index_filename(log_filename), 'rb')
+        self.index = mmap.mmap(self.index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        header = INDEX_HEADER.unpack_from(self.index, 0)
+        if header[0] != INDEX_MAGIC or header[1] != INDEX_VERSION:
+            raise RecipeLogError(f"'{index_filename(log_filename)}' is not a recipe index")
+        _, _, _, self.log_id, self.indexed_size, ingredients_start, ingredients_count, recipes_start, recipes_count = header
+        self.ingredient_table = IndexTable(self.index, ingredients_start, ingredients_count, ingredient_key)
+        self.recipe_table = IndexTable(self.index, recipes_start, recipes_count)
+
+        self.log_file = open(log_filename, 'rb')
+        self.log = mmap.mmap(self.log_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        # Recipes added since the index was built, latest version of each
+        self.tail = {}
+        for _, _, recipe in iter_records(log_filename, start=self.indexed_size):
+            self.tail[recipe_key(recipe)] = recipe
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Unmap and close the index and the log."""
+        self.log.close()
+        self.log_file.close()
+        self.index.close()
+        self.index_file.close()
+
+    @property
+    def recipe_count(self):
+        """Number of current recipes."""
+        new = sum(1 for key in self.tail if self.recipe_table.find(key) is None)
+        return len(self.recipe_table) + new
+
+    @property
+    def ingredients(self):
+        """Names of every ingredient in use: indexed ones sorted by name, then new ones."""
+        names = [self.ingredient_table.name(position) for position in range(len(self.ingredient_table))]
+        seen = set()
+        for recipe in self.tail.values():
+            for ingredient in recipe['ingredients']:
+                key = ingredient_key(ingredient)
+                if key and key not in seen and self.ingredient_table.find(key) is None:
+                    seen.add(key)
+                    names.append(ingredient.strip())
+        return names
+
+    def read_recipe(self, offset):
+        """Read and check the record at an offset in the log."""
+        length, checksum = RECORD.unpack_from(self.log, offset)
+        payload = self.log[offset + RECORD.size:offset + RECORD.size + length]
+        if zlib.crc32(payload) != checksum:
+            raise RecipeLogError(f"damaged record at offset {offset}")
+        return pickle.loads(payload)
+
+    def search(self, ingredient):
+        """
+        Yield the current recipes that use an ingredient.
+
+        Reads only the records listed for the ingredient in the index, plus
+        the recipes added since the index was built.
+        """
+        key = ingredient_key(ingredient)
+        position = self.ingredient_table.find(key)
+        if position is not None:
+            for offset in self.ingredient_table.offsets(position):
+                recipe = self.read_recipe(offset)
+                # Skip recipes replaced by a newer record in the tail
+                if recipe_key(recipe) not in self.tail:
+                    yield recipe
+        for recipe in self.tail.values():
+            if key in {ingredient_key(name) for name in recipe['ingredients']}:
+                yield recipe
+
+
+def open_index(log_filename):
+    """
+    Open a recipe log for searching, building or rebuilding its index first if needed.
+
+    Returns:
+        RecipeIndex: The opened index
+    """
+    while True:
+        if not index_is_current(log_filename):
+            build_index(log_filename)
+        index = RecipeIndex(log_filename)
+        # The log may have been compacted since the index was checked
+        if read_header(index.log_file)[2] == index.log_id:
+            return index
+        index.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python recipe_index.py <log file>")
+        sys.exit(1)
+
+    count = build_index(sys.argv[1])
+    print(f"Indexed {count} ingredient(s) in '{index_filename(sys.argv[1])}'.")
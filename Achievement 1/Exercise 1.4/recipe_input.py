@@ -1,6 +1,9 @@
 # Exercise 1.4: Recipe Input with Binary File Storage
-# Import pickle module to work with binary files
-import pickle
+# Recipes are stored in an append-only recipe log (see recipe_log.py)
+import os
+import sys
+
+from recipe_log import append_recipes, compact_if_needed, open_log
 
 def calc_difficulty(cooking_time, ingredients):
     """
@@ -67,46 +70,34 @@ if __name__ == "__main__":
     # Ask user for filename
     filename = input("Enter the filename for recipe storage: ")
     
-    # Initialize data variable
-    data = {
-        'recipes_list': [],
-        'all_ingredients': []
-    }
-    
     # Try-except-else-finally block to handle file operations
     try:
-        # Try to open the file in binary read mode
-        with open(filename, 'rb') as file:
-            data = pickle.load(file)
-        print(f"File '{filename}' loaded successfully!")
-        
-    except FileNotFoundError:
-        # Handle case when file doesn't exist
-        print(f"File '{filename}' not found. Creating new data structure.")
-        data = {
-            'recipes_list': [],
-            'all_ingredients': []
-        }
+        # A missing file is created and an old pickle file converted to the
+        # recipe log format, both under the log's lock
+        created, converted = open_log(filename)
         
     except Exception as e:
-        # Handle other exceptions
-        print(f"An error occurred: {e}. Creating new data structure.")
-        data = {
-            'recipes_list': [],
-            'all_ingredients': []
-        }
+        # Handle other exceptions; leave the file untouched rather than overwrite it
+        print(f"An error occurred: {e}. '{filename}' is not a recipe file.")
+        sys.exit(1)
         
     else:
         # This runs if no exception occurred in try block
-        print("File loaded successfully without errors.")
+        if created:
+            print(f"File '{filename}' not found. Created a new recipe log.")
+        else:
+            if converted is not None:
+                print(f"Converted {converted} recipe(s) in '{filename}' to the recipe log format.")
+            print(f"File '{filename}' opened successfully!")
         
     finally:
-        # Extract values from dictionary into separate lists
-        recipes_list = data.get('recipes_list', [])
-        all_ingredients = data.get('all_ingredients', [])
-        
-        print(f"Current recipes in file: {len(recipes_list)}")
-        print(f"Current ingredients in file: {len(all_ingredients)}")
+        # Show the size of the store; recipes are not loaded into memory
+        if os.path.exists(filename):
+            print(f"Current file size: {os.path.getsize(filename)} bytes")
+    
+    # Recipes and ingredients entered in this session
+    recipes_list = []
+    all_ingredients = []
     
     # Ask user how many recipes they want to enter
     n = int(input("\nHow many recipes would you like to enter? "))
@@ -115,8 +106,13 @@ if __name__ == "__main__":
     for i in range(n):
         print(f"\n--- Enter Recipe {i + 1} ---")
         
-        # Call take_recipe() function and append to recipes_list
+        # Call take_recipe() function and append it to the file right away
         recipe = take_recipe()
+        try:
+            append_recipes(filename, [recipe])
+        except Exception as e:
+            print(f"Error saving recipe: {e}")
+            continue
         recipes_list.append(recipe)
         
         # Inner loop to scan through recipe's ingredients
@@ -128,35 +124,27 @@ if __name__ == "__main__":
         print(f"Recipe '{recipe['name']}' added successfully!")
         print(f"Difficulty: {recipe['difficulty']}")
     
-    # Gather updated data into dictionary
-    data = {
-        'recipes_list': recipes_list,
-        'all_ingredients': all_ingredients
-    }
-    
-    # Write data to binary file using pickle
+    # Drop replaced recipes from the file once it has grown enough
     try:
-        with open(filename, 'wb') as file:
-            pickle.dump(data, file)
-        print(f"\nData successfully saved to '{filename}'!")
-        
-        # Display summary
-        print("\n" + "="*50)
-        print("SUMMARY")
-        print("="*50)
-        print(f"Total recipes saved: {len(recipes_list)}")
-        print(f"Total unique ingredients: {len(all_ingredients)}")
-        print(f"File: {filename}")
-        
-        # Display all recipes
-        print("\n" + "="*50)
-        print("ALL SAVED RECIPES")
-        print("="*50)
-        for i, recipe in enumerate(recipes_list, 1):
-            print(f"\n{i}. {recipe['name']}")
-            print(f"   Cooking Time: {recipe['cooking_time']} minutes")
-            print(f"   Ingredients: {', '.join(recipe['ingredients'])}")
-            print(f"   Difficulty: {recipe['difficulty']}")
-            
+        if compact_if_needed(filename):
+            print(f"\nCompacted '{filename}'.")
     except Exception as e:
-        print(f"Error saving file: {e}")
\ No newline at end of file
+        print(f"Error compacting file: {e}")
+    
+    # Display summary
+    print("\n" + "="*50)
+    print("SUMMARY")
+    print("="*50)
+    print(f"Recipes saved this session: {len(recipes_list)}")
+    print(f"Unique ingredients this session: {len(all_ingredients)}")
+    print(f"File: {filename} ({os.path.getsize(filename)} bytes)")
+    
+    # Display the recipes entered in this session
+    print("\n" + "="*50)
+    print("RECIPES SAVED THIS SESSION")
+    print("="*50)
+    for i, recipe in enumerate(recipes_list, 1):
+        print(f"\n{i}. {recipe['name']}")
+        print(f"   Cooking Time: {recipe['cooking_time']} minutes")
+        print(f"   Ingredients: {', '.join(recipe['ingredients'])}")
+        print(f"   Difficulty: {recipe['difficulty']}")
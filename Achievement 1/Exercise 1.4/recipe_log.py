@@ -0,0 +1,455 @@
+# Exercise 1.4: Append-only Recipe Log
+# Storage format shared by recipe_input.py and recipe_search.py.
+#
+# A recipe log is a small header followed by length-prefixed records:
+#
+#   header:  magic b'RECIPLOG' | version (2 bytes) | reserved (2 bytes)
+#            | file size when compaction was last checked (8 bytes)
+#            | end of the records written by the last complete append (8 bytes)
+#            | random ID of this file, new each time the log is written (8 bytes)
+#   record:  payload length (4 bytes) | CRC-32 of payload (4 bytes) | payload
+#
+# Each payload is one pickled recipe dictionary. Adding a recipe appends one
+# record, so saving costs the same however many recipes the file holds. A
+# recipe entered again under the same name replaces the earlier one; the old
+# record stays in the file until the log is compacted.
+#
+# Several processes can add recipes to the same log. Every change holds an
+# exclusive lock on <log>.lock: appends write whole records under it, and
+# compaction rewrites the file to a temporary name and renames it into place
+# under it, so no append can land in a file that is being replaced. An append
+# first cuts off any partial record an interrupted append left at the end, so
+# a torn record can never hide the records written after it. The ID in the
+# header tells readers such as the index whether the log has been replaced.
+#
+# Usage:
+#     python recipe_log.py convert my_recipes.bin    (pickle file -> recipe log, in place)
+#     python recipe_log.py compact my_recipes.bin
+import os
+import pickle
+import struct
+import sys
+import time
+import zlib
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+MAGIC = b'RECIPLOG'
+VERSION = 1
+HEADER = struct.Struct('>8sHHQQQ')
+RECORD = struct.Struct('>II')
+# Header fields that are updated in place
+SIZE_FIELD = struct.Struct('>Q')
+CHECKED_SIZE_AT = 12
+END_AT = 20
+
+# Compaction is considered once the file has grown to COMPACT_GROWTH times its
+# size at the last check (and is at least COMPACT_MIN_SIZE bytes), and done if
+# at least COMPACT_MIN_DEAD of its records have been replaced
+COMPACT_GROWTH = 2
+COMPACT_MIN_SIZE = 64 * 1024
+COMPACT_MIN_DEAD = 0.25
+
+
+class RecipeLogError(Exception):
+    """Raised when a file is not a recipe log or its header is damaged."""
+
+
+def recipe_key(recipe):
+    """
+    Return the key recipes are identified by: the name, trimmed and case-folded.
+
+    Args:
+        recipe (dict): Recipe dictionary
+    """
+    return " ".join(recipe['name'].split()).casefold()
+
+
+def is_recipe_log(filename):
+    """
+    Check whether a file starts with the recipe log header.
+
+    Args:
+        filename (str): Path of the file
+
+    Returns:
+        bool: True for a recipe log, False for anything else (e.g. an old pickle file)
+    """
+    with open(filename, 'rb') as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+
+def read_header(file):
+    """
+    Read and check the header at the start of an open log file.
+
+    Returns:
+        tuple: (file size when compaction was last checked, end of the last complete append, log ID)
+    """
+    file.seek(0)
+    header = file.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise RecipeLogError("file is too short to be a recipe log")
+    magic, version, _, checked_size, end, log_id = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise RecipeLogError("file is not a recipe log")
+    if version != VERSION:
+        raise RecipeLogError(f"unsupported recipe log version {version}")
+    return checked_size, end, log_id
+
+
+def write_header_field(file, position, value):
+    """Overwrite one 8-byte header field of an open log file in place."""
+    file.seek(position)
+    file.write(SIZE_FIELD.pack(value))
+
+
+def encode_record(recipe):
+    """Return the bytes of one length-prefixed, checksummed record."""
+    payload = pickle.dumps(recipe, protocol=pickle.HIGHEST_PROTOCOL)
+    return RECORD.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+@contextmanager
+def locked(filename):
+    """
+    Hold the exclusive write lock of a log for the duration of a with block.
+
+    The lock is taken on a separate <log>.lock file, because compaction
+    replaces the log file itself. Not reentrant: functions that lock call
+    the unlocked helpers below, never each other.
+
+    Args:
+        filename (str): Path of the log
+    """
+    with open(f"{filename}.lock", 'a+b') as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def write_log(filename, recipes):
+    """
+    Write a complete log to a temporary file and rename it over filename.
+
+    Readers see either the old file or the complete new one, told apart by
+    the new random log ID. Callers must hold the lock when filename may
+    already be in use.
+    """
+    log_id = int.from_bytes(os.urandom(SIZE_FIELD.size), 'big')
+    temp_name = f"{filename}.{os.getpid()}.tmp"
+    with open(temp_name, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, 0, 0, 0, log_id))
+        for recipe in recipes:
+            file.write(encode_record(recipe))
+        # Record the size so growth can be measured from here
+        size = file.tell()
+        file.seek(0)
+        file.write(HEADER.pack(MAGIC, VERSION, 0, size, size, log_id))
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_name, filename)
+
+
+def create_log(filename, recipes=()):
+    """
+    Create (or replace) a recipe log containing the given recipes.
+
+    Args:
+        filename (str): Path of the log
+        recipes (iterable): Recipe dictionaries to store
+    """
+    with locked(filename):
+        write_log(filename, recipes)
+
+
+def open_log(filename):
+    """
+    Make sure a recipe log exists at filename, creating or converting it under the lock.
+
+    A missing file becomes an empty log and an old pickle file is converted in
+    place. Both happen while holding the lock, so another process cannot
+    create or append to the file in between and have its recipes replaced.
+
+    Args:
+        filename (str): Path of the log
+
+    Returns:
+        tuple: (True if a new log was created, number of recipes converted or None if no conversion was needed)
+    """
+    with locked(filename):
+        if not os.path.exists(filename):
+            write_log(filename, ())
+            return True, None
+        if is_recipe_log(filename):
+            return False, None
+        recipes = load_pickle_recipes(filename)
+        write_log(filename, recipes)
+    return False, len(recipes)
+
+
+def append_recipes(filename, recipes):
+    """
+    Append recipes to an existing log with one write and one fsync.
+
+    The log is opened after taking the lock, so the records always go to the
+    current file even if another process has just compacted it. A partial
+    record left by an interrupted append is cut off first; finding it only
+    reads the records after the end noted in the header by the last append.
+
+    Args:
+        filename (str): Path of the log
+        recipes (list): Recipe dictionaries to add
+    """
+    data = b"".join(encode_record(recipe) for recipe in recipes)
+    with locked(filename):
+        with open(filename, 'r+b') as file:
+            _, end, _ = read_header(file)
+            size = os.fstat(file.fileno()).st_size
+            if not HEADER.size <= end <= size:
+                end = HEADER.size
+            for offset, length, _ in read_records(file, end):
+                end = offset + length
+            if end < size:
+                file.truncate(end)
+            file.seek(end)
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+            # Only after the records are on disk, so the header never points past them
+            write_header_field(file, END_AT, end + len(data))
+
+
+class RecipeLogWriter:
+    """
+    Adds recipes to a log, writing and syncing them in batches.
+
+    Recipes are held in memory until sync_every of them are waiting or
+    sync_interval seconds have passed since the last write (checked when a
+    recipe is added), then appended with one locked write and one fsync.
+    Leaving the with block (or close()) writes whatever is left.
+
+    With the default sync_every=1 every recipe is on disk when add() returns.
+    """
+
+    def __init__(self, filename, sync_every=1, sync_interval=None):
+        self.filename = filename
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.pending = []
+        self.last_sync = time.monotonic()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def add(self, recipe):
+        """Queue a recipe, writing the batch if it is full or old enough."""
+        self.pending.append(recipe)
+        overdue = self.sync_interval is not None and time.monotonic() - self.last_sync >= self.sync_interval
+        if len(self.pending) >= self.sync_every or overdue:
+            self.flush()
+
+    def flush(self):
+        """Append and sync every queued recipe."""
+        if self.pending:
+            append_recipes(self.filename, self.pending)
+            self.pending = []
+        self.last_sync = time.monotonic()
+
+    def close(self):
+        """Write the remaining recipes."""
+        self.flush()
+
+
+def iter_records(filename, start=None):
+    """
+    Stream every record in the log, one at a time, in the order written.
+
+    Reading stops at the first incomplete or damaged record, which is what an
+    interrupted append leaves at the end of the file.
+
+    Args:
+        filename (str): Path of the log
+        start (int): Offset of the first record to read; defaults to the first record in the file
+
+    Yields:
+        tuple: (offset of the record, size of the record in bytes, recipe dictionary)
+    """
+    with open(filename, 'rb') as file:
+        read_header(file)
+        for offset, size, payload in read_records(file, start or HEADER.size):
+            yield offset, size, pickle.loads(payload)
+
+
+def read_records(file, offset):
+    """
+    Read the complete, undamaged records of an open log file from an offset on.
+
+    Yields:
+        tuple: (offset of the record, size of the record in bytes, pickled payload)
+    """
+    file.seek(offset)
+    while True:
+        prefix = file.read(RECORD.size)
+        if len(prefix) < RECORD.size:
+            return
+        length, checksum = RECORD.unpack(prefix)
+        payload = file.read(length)
+        if len(payload) < length or zlib.crc32(payload) != checksum:
+            return
+        yield offset, RECORD.size + length, payload
+        offset += RECORD.size + length
+
+
+def iter_recipes(filename):
+    """
+    Stream the current recipes in the log, skipping replaced records.
+
+    Makes two passes over the file: the first notes where the latest record
+    of each recipe is, the second yields those records. Only the keys and
+    offsets are kept in memory, never the whole recipe list.
+
+    Old pickle files are also accepted and read the old way.
+
+    Args:
+        filename (str): Path of the log
+
+    Yields:
+        dict: Recipe dictionaries, in the order first entered
+    """
+    if not is_recipe_log(filename):
+        yield from load_pickle_recipes(filename)
+        return
+
+    latest = {}
+    for offset, _, recipe in iter_records(filename):
+        latest[recipe_key(recipe)] = offset
+    live = set(latest.values())
+    for offset, _, recipe in iter_records(filename):
+        if offset in live:
+            yield recipe
+
+
+def log_stats(filename):
+    """
+    Count the records in the log.
+
+    Returns:
+        tuple: (number of records, number of current recipes, bytes of valid records)
+    """
+    records = 0
+    keys = set()
+    end = HEADER.size
+    for offset, size, recipe in iter_records(filename):
+        records += 1
+        keys.add(recipe_key(recipe))
+        end = offset + size
+    return records, len(keys), end
+
+
+def compact(filename):
+    """
+    Rewrite the log with only the current version of each recipe.
+
+    Also drops a damaged record left at the end by an interrupted append.
+
+    Returns:
+        tuple: (records before, records after)
+    """
+    with locked(filename):
+        records, recipes, _ = log_stats(filename)
+        write_log(filename, iter_recipes(filename))
+    return records, recipes
+
+
+def compact_if_needed(filename):
+    """
+    Compact the log if it has grown enough and holds enough replaced records.
+
+    The growth check only compares the file size with the size recorded in
+    the header, so most calls cost no reading at all.
+
+    Returns:
+        bool: True if the log was compacted
+    """
+    size = os.path.getsize(filename)
+    with open(filename, 'rb') as file:
+        checked_size, _, _ = read_header(file)
+    if size < COMPACT_MIN_SIZE or size < checked_size * COMPACT_GROWTH:
+        return False
+
+    with locked(filename):
+        size = os.path.getsize(filename)
+        records, recipes, end = log_stats(filename)
+        if end == size and records and (records - recipes) / records < COMPACT_MIN_DEAD:
+            # Not worth it yet; wait for the file to grow again before rescanning
+            with open(filename, 'r+b') as file:
+                write_header_field(file, CHECKED_SIZE_AT, size)
+            return False
+        write_log(filename, iter_recipes(filename))
+    return True
+
+
+def load_pickle_recipes(filename):
+    """
+    Read the recipes list from an old pickle file ({'recipes_list': [...], 'all_ingredients': [...]}).
+
+    Returns:
+        list: Recipe dictionaries
+    """
+    with open(filename, 'rb') as file:
+        data = pickle.load(file)
+    return data.get('recipes_list', [])
+
+
+def convert_pickle(source, destination=None):
+    """
+    Convert an old pickle recipe file to a recipe log.
+
+    Args:
+        source (str): Path of the pickle file
+        destination (str): Path of the new log; defaults to replacing source in place
+
+    Returns:
+        int: Number of recipes converted
+    """
+    destination = destination or source
+    with locked(destination):
+        # Another process may have converted the file while we waited
+        if destination == source and is_recipe_log(source):
+            return 0
+        recipes = load_pickle_recipes(source)
+        write_log(destination, recipes)
+    return len(recipes)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] not in ('convert', 'compact'):
+        print("Usage: python recipe_log.py convert <pickle file> [<log file>]")
+        print("       python recipe_log.py compact <log file>")
+        sys.exit(1)
+
+    if sys.argv[1] == 'convert':
+        count = convert_pickle(sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else None)
+        print(f"Converted {count} recipe(s) to a recipe log.")
+    else:
+        before, after = compact(sys.argv[2])
+        print(f"Compacted {before} record(s) to {after} recipe(s).")
@@ -1,6 +1,7 @@
 # Exercise 1.4: Recipe Search System
-# Import pickle module to work with binary files
-import pickle
+# Recipes are found through the recipe log's memory-mapped index (see recipe_index.py)
+from recipe_index import open_index
+from recipe_log import convert_pickle, is_recipe_log
 
 def display_recipe(recipe):
     """
@@ -22,16 +23,15 @@ def display_recipe(recipe):
     
     print("="*50)
 
-def search_ingredient(data):
+def search_ingredient(index):
     """
     Search for recipes containing a specific ingredient.
     
     Args:
-        data (dict): Dictionary containing recipes_list and all_ingredients
+        index (RecipeIndex): Opened index of the recipe file
     """
-    # Get all ingredients from data
-    all_ingredients = data['all_ingredients']
-    recipes_list = data['recipes_list']
+    # Get all ingredients from the index
+    all_ingredients = index.ingredients
     
     # Show all available ingredients with numbers
     print("\nAll available ingredients:")
@@ -67,12 +67,10 @@ def search_ingredient(data):
         
         found_recipes = []
         
-        # Go through every recipe in recipes_list
-        for recipe in recipes_list:
-            # Check if the searched ingredient is in this recipe
-            if ingredient_searched in recipe['ingredients']:
-                found_recipes.append(recipe)
-                display_recipe(recipe)
+        # Read only the recipes the index lists for this ingredient
+        for recipe in index.search(ingredient_searched):
+            found_recipes.append(recipe)
+            display_recipe(recipe)
         
         # Show results summary
         if found_recipes:
@@ -87,18 +85,21 @@ if __name__ == "__main__":
     # Ask user for the filename
     filename = input("Enter the filename that contains your recipe data: ")
     
-    # Try to open and load the file
+    # Try to open the file and its index
     try:
-        # Open the file in binary read mode
-        with open(filename, 'rb') as file:
-            # Extract contents using pickle
-            data = pickle.load(file)
+        # Old pickle files are converted to the recipe log format once
+        if not is_recipe_log(filename):
+            count = convert_pickle(filename)
+            print(f"Converted {count} recipe(s) in '{filename}' to the recipe log format.")
+        
+        # Builds the index first if it is missing or out of date
+        index = open_index(filename)
         
         print(f"Successfully loaded data from '{filename}'!")
         
         # Display summary of loaded data
-        recipes_count = len(data.get('recipes_list', []))
-        ingredients_count = len(data.get('all_ingredients', []))
+        recipes_count = index.recipe_count
+        ingredients_count = len(index.ingredients)
         
         print(f"Found {recipes_count} recipe(s) and {ingredients_count} unique ingredient(s)")
         
@@ -115,4 +116,5 @@ if __name__ == "__main__":
         
     else:
         # Call search_ingredient function if file loaded successfully
-        search_ingredient(data)
\ No newline at end of file
+        with index:
+            search_ingredient(index)
\ No newline at end of file
@@ -1,4 +1,98 @@
+import re
+import threading
+from contextlib import contextmanager
+
 import mysql.connector
+from mysql.connector import errorcode, pooling
+
+# Connection settings shared by the setup connection and the pool
+DB_CONFIG = {
+    'host': 'localhost',
+    'user': 'cf-python',
+    'passwd': 'password',
+}
+DATABASE = 'task_database'
+# Connections kept open in the pool; also the number of operations that can run at once
+POOL_SIZE = 5
+# Created at startup; see pooled_connection()
+pool = None
+pool_slots = threading.BoundedSemaphore(POOL_SIZE)
+
+# Name of the FULLTEXT index used for ingredient searches
+FULLTEXT_INDEX = 'ft_recipes_name_ingredients'
+# InnoDB does not index words shorter than innodb_ft_min_token_size (3 by default)
+FULLTEXT_MIN_WORD_LENGTH = 3
+# Words of that length or longer in InnoDB's default stopword list, also not indexed
+FULLTEXT_STOPWORDS = frozenset({
+    'about', 'are', 'com', 'for', 'from', 'how', 'that', 'the', 'this',
+    'und', 'was', 'what', 'when', 'where', 'who', 'will', 'with', 'www',
+})
+# Set at startup by ensure_fulltext_index(); False means searches use the
+# RecipeIngredients links alone
+fulltext_enabled = False
+# Rows per fetchmany() call when streaming query results
+FETCH_SIZE = 500
+# Recipes shown per page in the update and delete menus
+PAGE_SIZE = 20
+
+# Hot CRUD statements, run through execute_prepared() so the server parses
+# each one once per borrowed connection instead of on every call
+INSERT_RECIPE = "INSERT INTO Recipes (name, ingredients, cooking_time, difficulty) VALUES (%s, %s, %s, %s)"
+SELECT_RECIPE = "SELECT id, name, ingredients, cooking_time, difficulty FROM Recipes WHERE id = %s"
+SELECT_RECIPE_PAGE = "SELECT id, name, cooking_time, difficulty FROM Recipes WHERE id > %s ORDER BY id LIMIT %s"
+UPDATE_NAME = "UPDATE Recipes SET name = %s WHERE id = %s"
+UPDATE_COOKING_TIME = "UPDATE Recipes SET cooking_time = %s, difficulty = %s WHERE id = %s"
+UPDATE_INGREDIENTS = "UPDATE Recipes SET ingredients = %s, difficulty = %s WHERE id = %s"
+DELETE_RECIPE = "DELETE FROM Recipes WHERE id = %s"
+# Prepared cursors of each connection in use, by statement; see close_prepared()
+prepared_cursors = {}
+
+# Function to borrow a connection from the pool
+@contextmanager
+def pooled_connection():
+    """
+    Borrow a pooled connection for one operation.
+    
+    Waits for a free connection instead of failing when all POOL_SIZE are in
+    use, commits on success, rolls back on error and returns the connection
+    to the pool afterwards, without the statements it prepared.
+    """
+    with pool_slots:
+        conn = pool.get_connection()
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            close_prepared(conn)
+            conn.close()
+
+# Function to run a hot statement as a prepared statement
+def execute_prepared(conn, query, params):
+    """
+    Execute one of the hot CRUD statements on a prepared cursor.
+    
+    The statement is prepared the first time it runs on the connection and
+    reused by later calls until close_prepared(), which pooled_connection()
+    calls when the connection goes back to the pool.
+    
+    Returns:
+        The prepared cursor; fetch all rows of a SELECT before the next query.
+    """
+    cursors = prepared_cursors.setdefault(conn, {})
+    cursor = cursors.get(query)
+    if cursor is None:
+        cursor = cursors[query] = conn.cursor(prepared=True)
+    cursor.execute(query, params)
+    return cursor
+
+# Function to close the prepared statements of a connection
+def close_prepared(conn):
+    """Close the cursors execute_prepared() opened on conn, deallocating their statements on the server."""
+    for cursor in prepared_cursors.pop(conn, {}).values():
+        cursor.close()
 
 # Function to calculate recipe difficulty
 def calculate_difficulty(cooking_time, ingredients):
@@ -23,81 +117,367 @@ def calculate_difficulty(cooking_time, ingredients):
     else:  # cooking_time >= 10 and num_ingredients >= 4
         return "Hard"
 
-# Function to create a new recipe
-def create_recipe(conn, cursor):
-    """Create a new recipe and add it to the database."""
-    print("\n=== CREATE NEW RECIPE ===")
+# Function to create the tables used by the manager
+def create_tables(cursor):
+    """Create Recipes and the normalized Ingredients and RecipeIngredients tables if they do not exist."""
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS Recipes (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        name VARCHAR(50) NOT NULL,
+        ingredients VARCHAR(255) NOT NULL,
+        cooking_time INT NOT NULL,
+        difficulty VARCHAR(20) NOT NULL
+    )
+    """)
     
-    # Collect recipe details
-    name = input("Enter recipe name: ")
+    # Normalized ingredient tables, used for the search vocabulary and matching
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS Ingredients (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        name VARCHAR(255) NOT NULL,
+        UNIQUE KEY uq_ingredients_name (name)
+    )
+    """)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS RecipeIngredients (
+        recipe_id INT NOT NULL,
+        ingredient_id INT NOT NULL,
+        PRIMARY KEY (recipe_id, ingredient_id),
+        KEY ix_recipe_ingredients_ingredient_id (ingredient_id),
+        FOREIGN KEY (recipe_id) REFERENCES Recipes (id) ON DELETE CASCADE,
+        FOREIGN KEY (ingredient_id) REFERENCES Ingredients (id) ON DELETE CASCADE
+    )
+    """)
+
+# Function to add the FULLTEXT index used by searches
+def ensure_fulltext_index(cursor):
+    """
+    Add a FULLTEXT index on Recipes(name, ingredients) if it does not exist yet.
     
-    # Get cooking time with input validation
-    while True:
-        try:
-            cooking_time = int(input("Enter cooking time (in minutes): "))
-            if cooking_time > 0:
+    Returns:
+        bool: True if the index is available, False if the server cannot
+        create one (searches then use the RecipeIngredients links alone)
+    """
+    cursor.execute("""
+    SELECT COUNT(*) FROM information_schema.STATISTICS
+    WHERE table_schema = DATABASE() AND table_name = 'Recipes' AND index_name = %s
+    """, (FULLTEXT_INDEX,))
+    if cursor.fetchone()[0]:
+        return True
+    
+    try:
+        cursor.execute(f"ALTER TABLE Recipes ADD FULLTEXT INDEX {FULLTEXT_INDEX} (name, ingredients)")
+        return True
+    except mysql.connector.Error as err:
+        print(f"⚠️  FULLTEXT search unavailable ({err}), searching ingredient links only")
+        return False
+
+# Function to build a boolean mode FULLTEXT query
+def fulltext_query(ingredients):
+    """
+    Build an AGAINST() string that requires every ingredient as a phrase,
+    e.g. ['olive oil', 'garlic'] -> '+"olive oil" +"garlic"'.
+    
+    Args:
+        ingredients (list): Ingredients that must all be present
+        
+    Returns:
+        str: Boolean mode query, or None if an ingredient has a word that is
+        not in the FULLTEXT index (too short or a stopword)
+    """
+    terms = []
+    for ingredient in ingredients:
+        # Keep only word characters so boolean operators typed by users are ignored
+        words = re.findall(r"\w+", ingredient.lower())
+        if not words or any(len(word) < FULLTEXT_MIN_WORD_LENGTH or word in FULLTEXT_STOPWORDS for word in words):
+            return None
+        terms.append('+"' + " ".join(words) + '"')
+    return " ".join(terms)
+
+# Function to stream the rows of a query
+def stream_query(conn, query, params=()):
+    """
+    Run a query on an unbuffered cursor and yield its rows as they arrive.
+    
+    Rows are read from the server FETCH_SIZE at a time with fetchmany(), so
+    memory use does not depend on the size of the result. The generator must
+    be consumed (or closed) before the connection runs another query.
+    """
+    stream = conn.cursor(buffered=False)
+    try:
+        stream.execute(query, params)
+        while True:
+            rows = stream.fetchmany(FETCH_SIZE)
+            if not rows:
                 break
-            else:
-                print("Please enter a positive number.")
-        except ValueError:
-            print("Please enter a valid number.")
+            yield from rows
+    finally:
+        # Discard unread rows if the caller stopped early
+        if conn.unread_result:
+            conn.consume_results()
+        stream.close()
+
+# Function to find recipes containing all given ingredients
+def find_recipes(conn, ingredients):
+    """
+    Yield the recipes linked to every ingredient in the list.
+    
+    Ingredients are matched by exact name through RecipeIngredients, so
+    'egg' finds neither 'eggs' nor 'eggplant'. When the FULLTEXT index is
+    available, MATCH ... AGAINST first narrows the rows to recipes whose text
+    contains every name as a phrase. fulltext_query() gives up on names the
+    index could miss, so both paths return the same recipes.
+    
+    Args:
+        conn: Connection to run the query on
+        ingredients (list): Ingredient names as stored in Ingredients
+    """
+    global fulltext_enabled
+    names = list(dict.fromkeys(ingredients))
+    linked = " AND ".join(["""
+    EXISTS (
+        SELECT 1 FROM RecipeIngredients ri
+        JOIN Ingredients i ON i.id = ri.ingredient_id
+        WHERE ri.recipe_id = r.id AND i.name = %s
+    )"""] * len(names))
+    query = f"SELECT r.id, r.name, r.ingredients, r.cooking_time, r.difficulty FROM Recipes r WHERE {linked}"
+    
+    against = fulltext_query(names) if fulltext_enabled else None
+    if against:
+        try:
+            yield from stream_query(
+                conn,
+                query + " AND MATCH(r.name, r.ingredients) AGAINST (%s IN BOOLEAN MODE)",
+                (*names, against),
+            )
+            return
+        except mysql.connector.Error as err:
+            # The index was dropped or the table engine cannot use it
+            if err.errno not in (errorcode.ER_FT_MATCHING_KEY_NOT_FOUND, errorcode.ER_TABLE_CANT_HANDLE_FT):
+                raise
+            fulltext_enabled = False
+    
+    yield from stream_query(conn, query, names)
+
+# Function to split an ingredients string into normalized names
+def split_ingredients(ingredients_str):
+    """Return the distinct ingredient names in a comma-separated string, trimmed and lower case."""
+    names = (" ".join(name.split()).lower() for name in (ingredients_str or "").split(","))
+    return list(dict.fromkeys(name for name in names if name))
+
+# Function to store recipe ingredients in the normalized tables
+def link_ingredients(cursor, recipe_ingredients):
+    """
+    Add missing ingredients to Ingredients and link them in RecipeIngredients.
     
-    # Get ingredients
-    print("Enter ingredients (type 'done' when finished):")
-    ingredients = []
+    Both tables are written with multi-row INSERTs and the ingredient ids are
+    read with one SELECT, so the number of round trips does not grow with
+    the number of recipes. Rows that already exist are left as they are;
+    any other error (a missing recipe, a name that is too long) is raised.
+    
+    Args:
+        cursor: Buffered cursor to run the statements on
+        recipe_ingredients (dict): Recipe id -> list of normalized ingredient names
+    """
+    names = sorted({name for names in recipe_ingredients.values() for name in names})
+    if not names:
+        return
+    
+    cursor.executemany(
+        "INSERT INTO Ingredients (name) VALUES (%s) ON DUPLICATE KEY UPDATE name = name",
+        [(name,) for name in names],
+    )
+    cursor.execute(f"SELECT name, id FROM Ingredients WHERE name IN ({', '.join(['%s'] * len(names))})", names)
+    ingredient_ids = dict(cursor.fetchall())
+    # A name the column collation treats as equal to a stored one (e.g. 'creme'
+    # and 'crème') shares its row but comes back spelled as stored
+    for name in names:
+        if name not in ingredient_ids:
+            cursor.execute("SELECT id FROM Ingredients WHERE name = %s", (name,))
+            ingredient_ids[name] = cursor.fetchone()[0]
+    
+    cursor.executemany(
+        "INSERT INTO RecipeIngredients (recipe_id, ingredient_id) VALUES (%s, %s)"
+        " ON DUPLICATE KEY UPDATE recipe_id = recipe_id",
+        [(recipe_id, ingredient_ids[name]) for recipe_id, names in recipe_ingredients.items() for name in names],
+    )
+
+# Function to fill the normalized tables for existing recipes
+def migrate_ingredients(conn, cursor, batch_size=1000):
+    """
+    Link the ingredients of every recipe that has no RecipeIngredients rows yet.
+    
+    Walks the table in id order a batch at a time, so it is safe to run on
+    large tables and to run again after an interruption.
+    
+    Returns:
+        int: Number of recipes migrated
+    """
+    migrated = 0
+    last_id = 0
     while True:
-        ingredient = input("Ingredient: ").strip()
-        if ingredient.lower() == 'done':
-            if ingredients:
-                break
-            else:
-                print("Please enter at least one ingredient.")
-        elif ingredient:
-            ingredients.append(ingredient)
+        cursor.execute("""
+        SELECT id, ingredients FROM Recipes r
+        WHERE id > %s AND NOT EXISTS (SELECT 1 FROM RecipeIngredients ri WHERE ri.recipe_id = r.id)
+        ORDER BY id
+        LIMIT %s
+        """, (last_id, batch_size))
+        batch = cursor.fetchall()
+        if not batch:
+            return migrated
+        link_ingredients(cursor, {recipe_id: split_ingredients(ingredients_str) for recipe_id, ingredients_str in batch})
+        conn.commit()
+        migrated += len(batch)
+        last_id = batch[-1][0]
+
+# Function to let the user pick a recipe from a paged list
+def choose_recipe(conn, action):
+    """
+    Show recipes PAGE_SIZE at a time and ask for the ID of one of them.
     
-    # Calculate difficulty
-    difficulty = calculate_difficulty(cooking_time, ingredients)
+    Pages are fetched with keyset pagination (WHERE id > last id shown),
+    so each page is a primary key range read however large the table is.
     
-    # Convert ingredients list to comma-separated string
-    ingredients_str = ", ".join(ingredients)
+    Args:
+        conn: Connection to run the queries on
+        action (str): What will be done with the recipe, e.g. 'update'
+        
+    Returns:
+        tuple: (id, name, ingredients, cooking_time, difficulty) of the chosen
+        recipe, or None if there are no recipes
+    """
+    last_id = 0
+    more = True
+    while True:
+        if more:
+            page = execute_prepared(conn, SELECT_RECIPE_PAGE, (last_id, PAGE_SIZE)).fetchall()
+            if not page and last_id == 0:
+                print("No recipes found in the database.")
+                return None
+            
+            print("-" * 50)
+            for recipe in page:
+                print(f"ID: {recipe[0]} | Name: {recipe[1]} | Time: {recipe[2]}min | Difficulty: {recipe[3]}")
+            print("-" * 50)
+            if page:
+                last_id = page[-1][0]
+            more = len(page) == PAGE_SIZE
+        
+        prompt = f"Enter the ID of the recipe to {action}"
+        answer = input(prompt + (" (or press Enter for more recipes): " if more else ": ")).strip()
+        if not answer:
+            if not more:
+                print("No more recipes.")
+            continue
+        
+        try:
+            recipe_id = int(answer)
+        except ValueError:
+            print("Please enter a valid number.")
+            continue
+        
+        # Check if recipe exists and get its details
+        result = execute_prepared(conn, SELECT_RECIPE, (recipe_id,)).fetchall()
+        if result:
+            return result[0]
+        print("Recipe with that ID not found. Please try again.")
+
+# Function to insert recipes in one batch
+def insert_recipes(conn, cursor, recipes):
+    """
+    Insert recipes and link their ingredients.
+    
+    Each recipe is inserted with the prepared INSERT so its id can be read
+    from lastrowid; a multi-row INSERT only reports the first id, and the
+    others are not consecutive with auto_increment_increment > 1, interleaved
+    inserts (innodb_autoinc_lock_mode = 2) or Galera. The ingredients of the
+    whole batch are then linked together.
     
-    # Build and execute SQL query
-    query = """
-    INSERT INTO Recipes (name, ingredients, cooking_time, difficulty) 
-    VALUES (%s, %s, %s, %s)
+    Args:
+        conn: Connection to run the statements on
+        cursor: Buffered cursor on conn
+        recipes (list): (name, ingredients list, cooking_time) tuples
+        
+    Returns:
+        list: (id, name, difficulty) of each inserted recipe
     """
+    rows = [
+        (name, ", ".join(ingredients), cooking_time, calculate_difficulty(cooking_time, ingredients))
+        for name, ingredients, cooking_time in recipes
+    ]
+    recipe_ids = [execute_prepared(conn, INSERT_RECIPE, row).lastrowid for row in rows]
+    link_ingredients(cursor, {recipe_id: split_ingredients(row[1]) for recipe_id, row in zip(recipe_ids, rows)})
+    return [(recipe_id, row[0], row[3]) for recipe_id, row in zip(recipe_ids, rows)]
+
+# Function to create a new recipe
+def create_recipe(conn, cursor):
+    """Create one or more new recipes and add them to the database."""
+    print("\n=== CREATE NEW RECIPE ===")
+    
+    recipes = []
+    while True:
+        # Collect recipe details
+        name = input("Enter recipe name: ")
+        
+        # Get cooking time with input validation
+        while True:
+            try:
+                cooking_time = int(input("Enter cooking time (in minutes): "))
+                if cooking_time > 0:
+                    break
+                else:
+                    print("Please enter a positive number.")
+            except ValueError:
+                print("Please enter a valid number.")
+        
+        # Get ingredients
+        print("Enter ingredients (type 'done' when finished):")
+        ingredients = []
+        while True:
+            ingredient = input("Ingredient: ").strip()
+            if ingredient.lower() == 'done':
+                if ingredients:
+                    break
+                else:
+                    print("Please enter at least one ingredient.")
+            elif ingredient:
+                ingredients.append(ingredient)
+        
+        recipes.append((name, ingredients, cooking_time))
+        
+        # Recipes entered together are saved in one batch
+        if input("Add another recipe? (yes/no): ").strip().lower() not in ['yes', 'y']:
+            break
     
     try:
-        cursor.execute(query, (name, ingredients_str, cooking_time, difficulty))
+        for recipe_id, name, difficulty in insert_recipes(conn, cursor, recipes):
+            print(f"✅ Recipe '{name}' added successfully!")
+            print(f"   Difficulty: {difficulty}")
         conn.commit()
-        print(f"✅ Recipe '{name}' added successfully!")
-        print(f"   Difficulty: {difficulty}")
     except mysql.connector.Error as err:
+        # Undo the part of the batch already inserted
+        conn.rollback()
         print(f"❌ Error adding recipe: {err}")
+        print("   No recipes from this batch were saved.")
 
 # Function to search for recipes by ingredient
 def search_recipe(conn, cursor):
-    """Search for recipes containing a specific ingredient."""
+    """Search for recipes containing one or more selected ingredients."""
     print("\n=== SEARCH RECIPES BY INGREDIENT ===")
     
-    # Get all ingredients from the database
+    # Get the distinct ingredients used by any recipe from the normalized tables
     try:
-        cursor.execute("SELECT ingredients FROM Recipes")
-        results = cursor.fetchall()
-        
-        if not results:
+        cursor.execute("SELECT 1 FROM Recipes LIMIT 1")
+        if not cursor.fetchall():
             print("No recipes found in the database.")
             return
         
-        # Extract unique ingredients
-        all_ingredients = []
-        for row in results:
-            ingredients_str = row[0] if row else ""
-            # Split by comma and clean up
-            recipe_ingredients = [ing.strip() for ing in ingredients_str.split(",")]
-            for ingredient in recipe_ingredients:
-                if ingredient and ingredient not in all_ingredients:
-                    all_ingredients.append(ingredient)
+        all_ingredients = [row[0] for row in stream_query(conn, """
+        SELECT DISTINCT i.name
+        FROM Ingredients i
+        JOIN RecipeIngredients ri ON ri.ingredient_id = i.id
+        ORDER BY i.name
+        """)]
         
         if not all_ingredients:
             print("No ingredients found.")
@@ -111,35 +491,36 @@ def search_recipe(conn, cursor):
         # Get user choice
         while True:
             try:
-                choice = int(input(f"\nSelect an ingredient (1-{len(all_ingredients)}): "))
-                if 1 <= choice <= len(all_ingredients):
-                    search_ingredient = all_ingredients[choice - 1]
+                choices = [int(num) for num in input(
+                    f"\nSelect one or more ingredients (1-{len(all_ingredients)}, separated by spaces): "
+                ).split()]
+                if choices and all(1 <= choice <= len(all_ingredients) for choice in choices):
+                    search_ingredients = [all_ingredients[choice - 1] for choice in choices]
                     break
                 else:
-                    print(f"Please enter a number between 1 and {len(all_ingredients)}")
+                    print(f"Please enter numbers between 1 and {len(all_ingredients)}")
             except ValueError:
-                print("Please enter a valid number.")
-        
-        # Search for recipes containing the ingredient
-        search_query = """
-        SELECT id, name, ingredients, cooking_time, difficulty 
-        FROM Recipes 
-        WHERE ingredients LIKE %s
-        """
+                print("Please enter valid numbers.")
         
-        cursor.execute(search_query, (f"%{search_ingredient}%",))
-        search_results = cursor.fetchall()
+        # Search for recipes containing all the selected ingredients
+        search_ingredient = ", ".join(search_ingredients)
         
-        if search_results:
-            print(f"\nRecipes containing '{search_ingredient}':")
-            print("-" * 80)
-            for recipe in search_results:
-                print(f"ID: {recipe[0]}")
-                print(f"Name: {recipe[1]}")
-                print(f"Ingredients: {recipe[2]}")
-                print(f"Cooking Time: {recipe[3]} minutes")
-                print(f"Difficulty: {recipe[4]}")
+        # Print results as they are streamed from the server
+        found = 0
+        for recipe in find_recipes(conn, search_ingredients):
+            if not found:
+                print(f"\nRecipes containing '{search_ingredient}':")
                 print("-" * 80)
+            found += 1
+            print(f"ID: {recipe[0]}")
+            print(f"Name: {recipe[1]}")
+            print(f"Ingredients: {recipe[2]}")
+            print(f"Cooking Time: {recipe[3]} minutes")
+            print(f"Difficulty: {recipe[4]}")
+            print("-" * 80)
+        
+        if found:
+            print(f"{found} recipe(s) found.")
         else:
             print(f"No recipes found containing '{search_ingredient}'.")
             
@@ -152,32 +533,12 @@ def update_recipe(conn, cursor):
     print("\n=== UPDATE RECIPE ===")
     
     try:
-        # Display all recipes
-        cursor.execute("SELECT id, name, cooking_time, difficulty FROM Recipes")
-        recipes = cursor.fetchall()
-        
-        if not recipes:
-            print("No recipes found in the database.")
-            return
-        
+        # Display recipes a page at a time and get the recipe ID to update
         print("\nAvailable recipes:")
-        print("-" * 50)
-        for recipe in recipes:
-            print(f"ID: {recipe[0]} | Name: {recipe[1]} | Time: {recipe[2]}min | Difficulty: {recipe[3]}")
-        print("-" * 50)
-        
-        # Get recipe ID to update
-        while True:
-            try:
-                recipe_id = int(input("Enter the ID of the recipe to update: "))
-                # Check if recipe exists
-                cursor.execute("SELECT id FROM Recipes WHERE id = %s", (recipe_id,))
-                if cursor.fetchone():
-                    break
-                else:
-                    print("Recipe with that ID not found. Please try again.")
-            except ValueError:
-                print("Please enter a valid number.")
+        chosen = choose_recipe(conn, "update")
+        if not chosen:
+            return
+        recipe_id, _, current_ingredients, current_cooking_time, _ = chosen
         
         # Get column to update
         print("\nWhat would you like to update?")
@@ -198,8 +559,7 @@ def update_recipe(conn, cursor):
         # Handle updates based on choice
         if choice == 1:  # Update name
             new_name = input("Enter new recipe name: ")
-            update_query = "UPDATE Recipes SET name = %s WHERE id = %s"
-            cursor.execute(update_query, (new_name, recipe_id))
+            execute_prepared(conn, UPDATE_NAME, (new_name, recipe_id))
             print(f"✅ Recipe name updated to '{new_name}'")
             
         elif choice == 2:  # Update cooking time
@@ -213,17 +573,14 @@ def update_recipe(conn, cursor):
                 except ValueError:
                     print("Please enter a valid number.")
             
-            # Get current ingredients to recalculate difficulty
-            cursor.execute("SELECT ingredients FROM Recipes WHERE id = %s", (recipe_id,))
-            ingredients_str = cursor.fetchone()[0]
-            ingredients_list = [ing.strip() for ing in ingredients_str.split(",")]
+            # Use current ingredients to recalculate difficulty
+            ingredients_list = [ing.strip() for ing in current_ingredients.split(",")]
             
             # Recalculate difficulty
             new_difficulty = calculate_difficulty(new_cooking_time, ingredients_list)
             
             # Update both cooking time and difficulty
-            update_query = "UPDATE Recipes SET cooking_time = %s, difficulty = %s WHERE id = %s"
-            cursor.execute(update_query, (new_cooking_time, new_difficulty, recipe_id))
+            execute_prepared(conn, UPDATE_COOKING_TIME, (new_cooking_time, new_difficulty, recipe_id))
             print(f"✅ Cooking time updated to {new_cooking_time} minutes")
             print(f"✅ Difficulty recalculated to '{new_difficulty}'")
             
@@ -240,25 +597,24 @@ def update_recipe(conn, cursor):
                 elif ingredient:
                     new_ingredients.append(ingredient)
             
-            # Get current cooking time to recalculate difficulty
-            cursor.execute("SELECT cooking_time FROM Recipes WHERE id = %s", (recipe_id,))
-            cooking_time = cursor.fetchone()[0]
-            
-            # Recalculate difficulty
-            new_difficulty = calculate_difficulty(cooking_time, new_ingredients)
+            # Recalculate difficulty with the current cooking time
+            new_difficulty = calculate_difficulty(current_cooking_time, new_ingredients)
             
             # Convert ingredients to string
             ingredients_str = ", ".join(new_ingredients)
             
             # Update both ingredients and difficulty
-            update_query = "UPDATE Recipes SET ingredients = %s, difficulty = %s WHERE id = %s"
-            cursor.execute(update_query, (ingredients_str, new_difficulty, recipe_id))
+            execute_prepared(conn, UPDATE_INGREDIENTS, (ingredients_str, new_difficulty, recipe_id))
+            cursor.execute("DELETE FROM RecipeIngredients WHERE recipe_id = %s", (recipe_id,))
+            link_ingredients(cursor, {recipe_id: split_ingredients(ingredients_str)})
             print(f"✅ Ingredients updated")
             print(f"✅ Difficulty recalculated to '{new_difficulty}'")
         
         conn.commit()
         
     except mysql.connector.Error as err:
+        # Undo the changes already made to this recipe
+        conn.rollback()
         print(f"❌ Error updating recipe: {err}")
 
 # Function to delete a recipe
@@ -267,55 +623,44 @@ def delete_recipe(conn, cursor):
     print("\n=== DELETE RECIPE ===")
     
     try:
-        # Display all recipes
-        cursor.execute("SELECT id, name, ingredients, cooking_time, difficulty FROM Recipes")
-        recipes = cursor.fetchall()
-        
-        if not recipes:
-            print("No recipes found in the database.")
-            return
-        
+        # Display recipes a page at a time and get the recipe ID to delete
         print("\nAll recipes:")
-        print("-" * 80)
-        for recipe in recipes:
-            print(f"ID: {recipe[0]}")
-            print(f"Name: {recipe[1]}")
-            print(f"Ingredients: {recipe[2]}")
-            print(f"Cooking Time: {recipe[3]} minutes")
-            print(f"Difficulty: {recipe[4]}")
-            print("-" * 80)
-        
-        # Get recipe ID to delete
-        while True:
-            try:
-                recipe_id = int(input("Enter the ID of the recipe to delete: "))
-                # Check if recipe exists and get its name
-                cursor.execute("SELECT name FROM Recipes WHERE id = %s", (recipe_id,))
-                result = cursor.fetchone()
-                if result:
-                    recipe_name = result[0]
-                    break
-                else:
-                    print("Recipe with that ID not found. Please try again.")
-            except ValueError:
-                print("Please enter a valid number.")
+        chosen = choose_recipe(conn, "delete")
+        if not chosen:
+            return
+        recipe_id, recipe_name = chosen[:2]
         
         # Confirm deletion
         confirm = input(f"Are you sure you want to delete '{recipe_name}'? (yes/no): ")
         if confirm.lower() in ['yes', 'y']:
-            # Delete the recipe
-            delete_query = "DELETE FROM Recipes WHERE id = %s"
-            cursor.execute(delete_query, (recipe_id,))
+            # Delete the recipe (its RecipeIngredients rows are removed by ON DELETE CASCADE)
+            execute_prepared(conn, DELETE_RECIPE, (recipe_id,))
             conn.commit()
             print(f"✅ Recipe '{recipe_name}' deleted successfully!")
         else:
             print("Deletion cancelled.")
             
     except mysql.connector.Error as err:
+        conn.rollback()
         print(f"❌ Error deleting recipe: {err}")
 
+# Function to run a menu operation on a pooled connection
+def run_operation(operation):
+    """
+    Run one menu operation on its own pooled connection and cursor.
+    
+    Operations share no connection or cursor, so several threads can run
+    them at the same time.
+    """
+    with pooled_connection() as conn:
+        cursor = conn.cursor(buffered=True)
+        try:
+            operation(conn, cursor)
+        finally:
+            cursor.close()
+
 # Main menu function
-def main_menu(conn, cursor):
+def main_menu():
     """Display the main menu and handle user choices."""
     while True:
         print("\n" + "="*50)
@@ -333,13 +678,13 @@ def main_menu(conn, cursor):
             choice = input("Enter your choice (1-5): ").strip()
             
             if choice == '1':
-                create_recipe(conn, cursor)
+                run_operation(create_recipe)
             elif choice == '2':
-                search_recipe(conn, cursor)
+                run_operation(search_recipe)
             elif choice == '3':
-                update_recipe(conn, cursor)
+                run_operation(update_recipe)
             elif choice == '4':
-                delete_recipe(conn, cursor)
+                run_operation(delete_recipe)
             elif choice == '5':
                 print("\nExiting...")
                 break
@@ -351,68 +696,77 @@ def main_menu(conn, cursor):
             break
         except Exception as e:
             print(f"❌ An error occurred: {e}")
-    
-    # Close the connection when exiting
-    try:
-        cursor.close()
-        conn.close()
-        print("✅ Database connection closed")
-    except:
-        pass
-
-# Step 2: Initialize a connection object called conn
-print("Connecting to MySQL server...")
-conn = mysql.connector.connect(
-    host='localhost',
-    user='cf-python',
-    passwd='password'
-)
-
-if conn.is_connected():
-    print("✅ Successfully connected to MySQL server!")
-else:
-    print("❌ Failed to connect to MySQL server")
-    exit(1)
-
-# Step 3: Initialize a cursor object from conn
-cursor = conn.cursor()
-print("✅ Cursor object initialized")
-
-# Step 4: Create a database called task_database
-print("Creating database...")
-cursor.execute("CREATE DATABASE IF NOT EXISTS task_database")
-print("✅ Database 'task_database' created (or already exists)")
 
-# Step 5: Access the database with USE statement
-cursor.execute("USE task_database")
-print("✅ Now using 'task_database'")
-
-# Step 6: Create a table called Recipes with specified columns
-print("Creating Recipes table...")
-create_table_query = """
-CREATE TABLE IF NOT EXISTS Recipes (
-    id INT AUTO_INCREMENT PRIMARY KEY,
-    name VARCHAR(50) NOT NULL,
-    ingredients VARCHAR(255) NOT NULL,
-    cooking_time INT NOT NULL,
-    difficulty VARCHAR(20) NOT NULL
-)
-"""
-
-cursor.execute(create_table_query)
-print("✅ Table 'Recipes' created (or already exists)")
-
-# Verify the table structure
-print("\nTable structure:")
-cursor.execute("DESCRIBE Recipes")
-columns = cursor.fetchall()
-for column in columns:
-    print(f"  Column: {column}")
-
-print("\n🎉 Database setup complete!")
-print("Database: task_database")
-print("Table: Recipes")
-print("Connection: Active")
-
-# Call the main menu function
-main_menu(conn, cursor)
+# Run the setup steps and the menu only when executed as a script, so the
+# functions above can be imported by the tests
+if __name__ == '__main__':
+    # Step 2: Initialize a connection object called conn, used for setup only
+    print("Connecting to MySQL server...")
+    conn = mysql.connector.connect(**DB_CONFIG)
+    
+    if conn.is_connected():
+        print("✅ Successfully connected to MySQL server!")
+    else:
+        print("❌ Failed to connect to MySQL server")
+        exit(1)
+    
+    # Step 3: Initialize a cursor object from conn
+    # Buffered, so single-row lookups never leave unread results on the connection;
+    # large reads go through stream_query() instead
+    cursor = conn.cursor(buffered=True)
+    print("✅ Cursor object initialized")
+    
+    # Step 4: Create a database called task_database
+    print("Creating database...")
+    cursor.execute(f"CREATE DATABASE IF NOT EXISTS {DATABASE}")
+    print("✅ Database 'task_database' created (or already exists)")
+    
+    # Step 5: Access the database with USE statement
+    cursor.execute(f"USE {DATABASE}")
+    print("✅ Now using 'task_database'")
+    
+    # Step 6: Create the Recipes table and the normalized ingredient tables
+    print("Creating tables...")
+    create_tables(cursor)
+    print("✅ Tables 'Recipes', 'Ingredients' and 'RecipeIngredients' created (or already exist)")
+    
+    # Step 7: Add a FULLTEXT index on name and ingredients for searches
+    fulltext_enabled = ensure_fulltext_index(cursor)
+    if fulltext_enabled:
+        print(f"✅ FULLTEXT index '{FULLTEXT_INDEX}' ready")
+    
+    # Step 8: Link the ingredients of recipes added before the normalized tables existed
+    migrated = migrate_ingredients(conn, cursor)
+    if migrated:
+        print(f"✅ Linked ingredients of {migrated} existing recipe(s)")
+    
+    # Verify the table structure
+    print("\nTable structure:")
+    cursor.execute("DESCRIBE Recipes")
+    columns = cursor.fetchall()
+    for column in columns:
+        print(f"  Column: {column}")
+    
+    cursor.close()
+    conn.close()
+    
+    # Step 9: Create the connection pool used by every menu operation.
+    # Prepared statements are closed before a connection returns to the pool,
+    # so sessions are not reset in between.
+    pool = pooling.MySQLConnectionPool(
+        pool_name='recipe_pool',
+        pool_size=POOL_SIZE,
+        pool_reset_session=False,
+        database=DATABASE,
+        **DB_CONFIG,
+    )
+    print(f"✅ Connection pool of {POOL_SIZE} connections ready")
+    
+    print("\n🎉 Database setup complete!")
+    print(f"Database: {DATABASE}")
+    print("Tables: Recipes, Ingredients, RecipeIngredients")
+    print(f"Search: {'FULLTEXT (MATCH ... AGAINST) + ingredient links' if fulltext_enabled else 'ingredient links'}")
+    print(f"Connections: pool of {POOL_SIZE}")
+    
+    # Call the main menu function
+    main_menu()
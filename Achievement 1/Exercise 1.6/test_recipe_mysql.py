@@ -0,0 +1,211 @@
+"""
+Tests for recipe_mysql.
+
+Most tests need a MySQL server and create and drop a scratch database on it.
+The server defaults to DB_CONFIG and can be changed with the
+RECIPE_MYSQL_TEST_HOST, RECIPE_MYSQL_TEST_USER and RECIPE_MYSQL_TEST_PASSWORD
+environment variables; those tests are skipped when it cannot be reached.
+
+Run from this directory with: python -m unittest test_recipe_mysql
+"""
+import os
+import unittest
+from unittest import mock
+
+import mysql.connector
+from mysql.connector import pooling
+
+import recipe_mysql
+
+TEST_DATABASE = 'recipe_mysql_test'
+TEST_CONFIG = {
+    'host': os.environ.get('RECIPE_MYSQL_TEST_HOST', recipe_mysql.DB_CONFIG['host']),
+    'user': os.environ.get('RECIPE_MYSQL_TEST_USER', recipe_mysql.DB_CONFIG['user']),
+    'passwd': os.environ.get('RECIPE_MYSQL_TEST_PASSWORD', recipe_mysql.DB_CONFIG['passwd']),
+}
+
+
+class FulltextQueryTests(unittest.TestCase):
+
+    def test_phrase_per_ingredient(self):
+        self.assertEqual(recipe_mysql.fulltext_query(['Olive  Oil', 'garlic']), '+"olive oil" +"garlic"')
+
+    def test_operators_removed(self):
+        self.assertEqual(recipe_mysql.fulltext_query(['-rice*']), '+"rice"')
+
+    def test_words_not_in_index(self):
+        self.assertIsNone(recipe_mysql.fulltext_query(['rice', 'ox tail']))
+        self.assertIsNone(recipe_mysql.fulltext_query(["baker's yeast"]))
+        self.assertIsNone(recipe_mysql.fulltext_query(['bread with butter']))
+
+
+class MySQLTestCase(unittest.TestCase):
+    """Runs each test in a new scratch database with the manager's tables."""
+
+    def setUp(self):
+        try:
+            self.conn = mysql.connector.connect(**TEST_CONFIG)
+        except mysql.connector.Error as err:
+            self.skipTest(f"MySQL server not available: {err}")
+        self.addCleanup(self.conn.close)
+        self.addCleanup(recipe_mysql.close_prepared, self.conn)
+        self.cursor = self.conn.cursor(buffered=True)
+        self.addCleanup(self.cursor.close)
+
+        self.cursor.execute(f"DROP DATABASE IF EXISTS {TEST_DATABASE}")
+        self.cursor.execute(f"CREATE DATABASE {TEST_DATABASE}")
+        self.addCleanup(self.cursor.execute, f"DROP DATABASE IF EXISTS {TEST_DATABASE}")
+        self.cursor.execute(f"USE {TEST_DATABASE}")
+        recipe_mysql.create_tables(self.cursor)
+
+
+class FindRecipesTests(MySQLTestCase):
+
+    def setUp(self):
+        super().setUp()
+        if not recipe_mysql.ensure_fulltext_index(self.cursor):
+            self.skipTest("server cannot create the FULLTEXT index")
+        recipe_mysql.insert_recipes(self.conn, self.cursor, [
+            ('Egg Curry', ['Eggplant', 'Curry paste', 'Rice'], 30),
+            ('Omelette', ['Eggs', 'Butter'], 5),
+            ('Boiled Egg', ['Egg', 'Salt'], 10),
+            ('Egg Fried Rice', ['egg', 'rice', 'Soy  Sauce'], 15),
+            ('Salt and Pepper Tofu', ['Tofu', 'Salt and pepper'], 20),
+            ("Baker's Bread", ["Baker's yeast", 'Flour', 'Water'], 120),
+        ])
+        # InnoDB adds rows to the FULLTEXT index when they are committed
+        self.conn.commit()
+
+    def search(self, ingredients, fulltext):
+        with mock.patch.object(recipe_mysql, 'fulltext_enabled', fulltext):
+            return sorted(recipe[1] for recipe in recipe_mysql.find_recipes(self.conn, ingredients))
+
+    def assertFound(self, ingredients, expected):
+        """Check that the FULLTEXT and the plain search both find exactly the expected recipes."""
+        for fulltext in (True, False):
+            with self.subTest(ingredients=ingredients, fulltext=fulltext):
+                self.assertEqual(self.search(ingredients, fulltext), sorted(expected))
+
+    def test_exact_ingredient_names(self):
+        self.assertFound(['egg'], ['Boiled Egg', 'Egg Fried Rice'])
+        self.assertFound(['eggs'], ['Omelette'])
+        self.assertFound(['eggplant'], ['Egg Curry'])
+        self.assertFound(['salt'], ['Boiled Egg'])
+
+    def test_every_ingredient_required(self):
+        self.assertFound(['rice'], ['Egg Curry', 'Egg Fried Rice'])
+        self.assertFound(['egg', 'rice'], ['Egg Fried Rice'])
+        self.assertFound(['egg', 'butter'], [])
+
+    def test_multi_word_ingredients(self):
+        self.assertFound(['soy sauce'], ['Egg Fried Rice'])
+        self.assertFound(['salt and pepper'], ['Salt and Pepper Tofu'])
+        self.assertFound(["baker's yeast", 'flour'], ["Baker's Bread"])
+
+
+class LinkIngredientsTests(MySQLTestCase):
+
+    def add_recipes(self, count):
+        """Insert recipes without linking their ingredients and return their ids."""
+        ids = []
+        for i in range(count):
+            self.cursor.execute(recipe_mysql.INSERT_RECIPE, (f"Recipe {i}", f"Egg, Flour {i}", 10, "Easy"))
+            ids.append(self.cursor.lastrowid)
+        return ids
+
+    def linked(self):
+        self.cursor.execute("""
+        SELECT ri.recipe_id, i.name FROM RecipeIngredients ri
+        JOIN Ingredients i ON i.id = ri.ingredient_id
+        ORDER BY ri.recipe_id, i.name
+        """)
+        return self.cursor.fetchall()
+
+    def test_existing_rows_reused(self):
+        first, second = self.add_recipes(2)
+        recipe_mysql.link_ingredients(self.cursor, {first: ['egg', 'flour']})
+        recipe_mysql.link_ingredients(self.cursor, {first: ['egg', 'milk'], second: ['egg']})
+
+        self.assertEqual(self.linked(), [(first, 'egg'), (first, 'flour'), (first, 'milk'), (second, 'egg')])
+        self.cursor.execute("SELECT COUNT(*) FROM Ingredients")
+        self.assertEqual(self.cursor.fetchone()[0], 3)
+
+    def test_errors_not_ignored(self):
+        with self.assertRaises(mysql.connector.IntegrityError):
+            recipe_mysql.link_ingredients(self.cursor, {12345: ['egg']})
+
+    def test_migrate_in_batches(self):
+        ids = self.add_recipes(5)
+        self.assertEqual(recipe_mysql.migrate_ingredients(self.conn, self.cursor, batch_size=2), 5)
+        self.assertEqual(recipe_mysql.migrate_ingredients(self.conn, self.cursor, batch_size=2), 0)
+
+        expected = [(recipe_id, name) for i, recipe_id in enumerate(ids) for name in ('egg', f'flour {i}')]
+        self.assertEqual(self.linked(), expected)
+
+
+class InsertRecipesTests(MySQLTestCase):
+
+    def test_ids_not_assumed_consecutive(self):
+        self.cursor.execute("SET SESSION auto_increment_increment = 5")
+        inserted = recipe_mysql.insert_recipes(self.conn, self.cursor, [
+            ('Pancakes', ['Flour', 'Milk', 'Egg'], 15),
+            ('Toast', ['Bread'], 3),
+            ('Porridge', ['Oats', 'Milk'], 10),
+        ])
+
+        self.cursor.execute("SELECT id, name, difficulty FROM Recipes ORDER BY id")
+        self.assertEqual(inserted, self.cursor.fetchall())
+        self.cursor.execute("""
+        SELECT r.name, i.name FROM RecipeIngredients ri
+        JOIN Recipes r ON r.id = ri.recipe_id
+        JOIN Ingredients i ON i.id = ri.ingredient_id
+        ORDER BY r.name, i.name
+        """)
+        self.assertEqual(self.cursor.fetchall(), [
+            ('Pancakes', 'egg'), ('Pancakes', 'flour'), ('Pancakes', 'milk'),
+            ('Porridge', 'milk'), ('Porridge', 'oats'),
+            ('Toast', 'bread'),
+        ])
+
+
+class PooledConnectionTests(MySQLTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # One connection, so every borrow gets the same server session
+        pool = pooling.MySQLConnectionPool(
+            pool_name='recipe_test_pool',
+            pool_size=1,
+            pool_reset_session=False,
+            database=TEST_DATABASE,
+            **TEST_CONFIG,
+        )
+        patcher = mock.patch.object(recipe_mysql, 'pool', pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def session_status(self, conn, name):
+        cursor = conn.cursor(buffered=True)
+        try:
+            cursor.execute("SHOW SESSION STATUS LIKE %s", (name,))
+            return int(cursor.fetchone()[1])
+        finally:
+            cursor.close()
+
+    def test_prepared_statements_closed_on_return(self):
+        with recipe_mysql.pooled_connection() as conn:
+            first = recipe_mysql.execute_prepared(conn, recipe_mysql.SELECT_RECIPE, (1,))
+            first.fetchall()
+            again = recipe_mysql.execute_prepared(conn, recipe_mysql.SELECT_RECIPE, (2,))
+            again.fetchall()
+            recipe_mysql.execute_prepared(conn, recipe_mysql.DELETE_RECIPE, (1,))
+            self.assertIs(again, first)
+        self.assertNotIn(conn, recipe_mysql.prepared_cursors)
+
+        with recipe_mysql.pooled_connection() as conn:
+            self.assertEqual(self.session_status(conn, 'Com_stmt_prepare'), 2)
+            self.assertEqual(self.session_status(conn, 'Com_stmt_close'), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+ASGI concurrency benchmark: sync views vs async views
+
+Starts the project under uvicorn twice against a scratch SQLite database -
+once with the regular views and once with DJANGO_ASYNC_VIEWS=1 - and drives
+each server with many slow clients (requests are trickled onto the socket in
+small chunks). Reports throughput and latency percentiles for each mode.
+
+Usage (from the src directory):
+    python benchmarks/asgi_concurrency.py --clients 50 --requests 10 --path /list/
+
+Requires uvicorn (pip install uvicorn).
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup_database(db_path, recipe_count):
+    """Migrate and seed a scratch database and return a session cookie"""
+    env = dict(os.environ, DJANGO_SQLITE_PATH=str(db_path))
+    subprocess.run(
+        [sys.executable, 'manage.py', 'migrate', '--verbosity', '0'],
+        cwd=SRC_DIR, env=env, check=True,
+    )
+
+    os.environ['DJANGO_SQLITE_PATH'] = str(db_path)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'recipe_project.settings')
+    sys.path.insert(0, str(SRC_DIR))
+    import django
+    django.setup()
+
+    from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+    from django.contrib.auth.models import User
+    from django.contrib.sessions.backends.db import SessionStore
+    from recipes.models import Recipe
+
+    user = User.objects.create_user(username='benchuser', password='benchpass123')
+    Recipe.objects.bulk_create(
+        Recipe(name=f"Recipe {i}", cooking_time=5 + (i * 7) % 120, difficulty='Medium', user=user)
+        for i in range(recipe_count)
+    )
+
+    session = SessionStore()
+    session[SESSION_KEY] = str(user.pk)
+    session[BACKEND_SESSION_KEY] = 'django.contrib.auth.backends.ModelBackend'
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    session.create()
+    return session.session_key
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(db_path, port, async_views):
+    env = dict(
+        os.environ,
+        DJANGO_SQLITE_PATH=str(db_path),
+        DJANGO_ASYNC_VIEWS='1' if async_views else '0',
+        DJANGO_VIEW_CACHE_TIMEOUT='0',  # measure the views, not the cache
+    )
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'recipe_project.asgi:application',
+         '--port', str(port), '--log-level', 'warning'],
+        cwd=SRC_DIR, env=env,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("uvicorn did not start within 30 seconds")
+
+
+async def slow_request(port, path, cookie, chunk_size, chunk_delay):
+    """Send one GET request in small delayed chunks and read the full reply"""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    request = (
+        f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+        f"Cookie: sessionid={cookie}\r\nConnection: close\r\n\r\n"
+    ).encode()
+    start = time.perf_counter()
+    for offset in range(0, len(request), chunk_size):
+        writer.write(request[offset:offset + chunk_size])
+        await writer.drain()
+        await asyncio.sleep(chunk_delay)
+    data = await reader.read()
+    elapsed = time.perf_counter() - start
+    writer.close()
+    status = int(data.split(b' ', 2)[1]) if data else 0
+    return elapsed, status
+
+
+async def run_clients(port, args, cookie):
+    latencies, errors = [], 0
+
+    async def client():
+        nonlocal errors
+        for _ in range(args.requests):
+            elapsed, status = await slow_request(port, args.path, cookie, args.chunk_size, args.chunk_delay)
+            if status == 200:
+                latencies.append(elapsed)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(args.clients)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--path', default='/list/', help="URL to request (default: /list/)")
+    parser.add_argument('--clients', type=int, default=50, help="Concurrent slow clients")
+    parser.add_argument('--requests', type=int, default=10, help="Requests per client")
+    parser.add_argument('--recipes', type=int, default=200, help="Recipes to seed")
+    parser.add_argument('--chunk-size', type=int, default=16, help="Bytes sent per chunk")
+    parser.add_argument('--chunk-delay', type=float, default=0.01, help="Seconds between chunks")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / 'bench.sqlite3'
+        cookie = setup_database(db_path, args.recipes)
+
+        print(f"ASGI benchmark: {args.clients} clients x {args.requests} requests to {args.path}")
+        print(f"{'mode':<8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+        for async_views in (False, True):
+            port = free_port()
+            server = start_server(db_path, port, async_views)
+            try:
+                latencies, errors, wall = asyncio.run(run_clients(port, args, cookie))
+            finally:
+                server.terminate()
+                server.wait()
+            mode = 'async' if async_views else 'sync'
+            print(
+                f"{mode:<8}{len(latencies) / wall:>10.1f}"
+                f"{percentile(latencies, 50) * 1000:>10.1f}"
+                f"{percentile(latencies, 95) * 1000:>10.1f}"
+                f"{percentile(latencies, 99) * 1000:>10.1f}"
+                f"{errors:>8}"
+            )
+            if latencies:
+                print(f"{'':<8}mean {statistics.mean(latencies) * 1000:.1f} ms over {len(latencies)} requests")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+Load test for the recipe app with scripted user journeys
+
+Each virtual user logs in and then repeats a journey through the app:
+
+    list -> detail -> search (name, ingredient, difficulty, cooking time,
+    show all) -> analytics
+
+pausing for a random think time between steps. Users share nothing but the
+server, so ``--users`` sets the concurrency. At the end the script reports
+throughput, latency percentiles and error rate for every step.
+
+Instead of the scripted journey, ``--replay`` drives the users through a
+recorded mix of URLs, one per line, either as ``PATH``, ``METHOD PATH`` or an
+access log line containing ``"METHOD PATH HTTP/1.1"``. Each user walks the file
+from a different offset, so the recorded mix is preserved.
+
+By default the script seeds a scratch SQLite database with
+``manage.py generate_catalog`` and starts the project under uvicorn; pass
+``--url`` to test an already running server instead (its database must have
+the ``loaduser_N`` accounts, which ``--create-users`` adds).
+
+Requests are sent over plain asyncio streams with HTTP/1.1 keep-alive, so no
+third-party HTTP client is needed.
+
+Usage (from the src directory):
+    python benchmarks/load_test.py --users 20 --duration 60
+    python benchmarks/load_test.py --users 50 --think-time 0 --workers 4
+    python benchmarks/load_test.py --replay urls.txt --duration 120
+    python benchmarks/load_test.py --url http://127.0.0.1:8000 --users 10
+
+Requires uvicorn (pip install uvicorn) unless --url is given.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from urllib.parse import urlencode, urlsplit
+
+SRC_DIR = Path(__file__).resolve().parent.parent
+
+USER_PREFIX = 'loaduser_'
+USER_PASSWORD = 'loadpass123'
+
+# One search per filter type, with values generate_catalog produces
+SEARCHES = {
+    'search:name': {'recipe_name': 'Garlic'},
+    'search:ingredient': {'ingredients': 'Onion'},
+    'search:difficulty': {'difficulty': 'medium'},
+    'search:cooking_time': {'cooking_time': 'quick'},
+}
+
+CSRF_INPUT = re.compile(rb'name="csrfmiddlewaretoken" value="([^"]+)"')
+LOG_REQUEST = re.compile(r'"?(GET|POST|HEAD|PUT|DELETE|PATCH) (\S+)')
+
+
+class Session:
+    """A keep-alive HTTP/1.1 connection with a cookie jar"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.cookies = {}
+        self.reader = self.writer = None
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+    async def request(self, method, path, data=None):
+        """Send a request and return (status, body); reconnects once if the server closed"""
+        for attempt in (1, 2):
+            if self.writer is None:
+                self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+            try:
+                return await self._exchange(method, path, data)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                await self.close()
+                if attempt == 2:
+                    raise
+
+    async def _exchange(self, method, path, data):
+        body = urlencode(data).encode() if data is not None else b''
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}"]
+        if self.cookies:
+            lines.append('Cookie: ' + '; '.join(f'{name}={value}' for name, value in self.cookies.items()))
+        if data is not None:
+            lines.append('Content-Type: application/x-www-form-urlencoded')
+            lines.append(f'Content-Length: {len(body)}')
+        self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode() + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readuntil(b'\r\n')
+        status = int(status_line.split(b' ', 2)[1])
+        headers = {}
+        while True:
+            line = await self.reader.readuntil(b'\r\n')
+            if line == b'\r\n':
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            name, value = name.strip().lower(), value.strip()
+            if name == 'set-cookie':
+                cookie, _, _ = value.partition(';')
+                key, _, cookie_value = cookie.partition('=')
+                self.cookies[key.strip()] = cookie_value.strip()
+            else:
+                headers[name] = value
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await self.reader.readuntil(b'\r\n')).split(b';')[0], 16)
+                chunk = await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+                chunks.append(chunk[:-2])
+            payload = b''.join(chunks)
+        elif 'content-length' in headers:
+            payload = await self.reader.readexactly(int(headers['content-length']))
+        else:
+            payload = await self.reader.read()
+            await self.close()
+        if headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return status, payload
+
+
+class Stats:
+    """Latencies and failures per step"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.error_samples = {}
+
+    def record(self, step, elapsed, error=None):
+        if error is None:
+            self.latencies[step].append(elapsed)
+        else:
+            self.errors[step] += 1
+            self.error_samples.setdefault(step, error)
+
+    def summary(self, wall):
+        rows = {}
+        for step in sorted(set(self.latencies) | set(self.errors)):
+            latencies = sorted(self.latencies[step])
+            total = len(latencies) + self.errors[step]
+            rows[step] = {
+                'requests': total,
+                'errors': self.errors[step],
+                'error_rate': round(self.errors[step] / total, 4),
+                'rps': round(total / wall, 2),
+                'p50_ms': percentile(latencies, 50),
+                'p95_ms': percentile(latencies, 95),
+                'p99_ms': percentile(latencies, 99),
+            }
+        return rows
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    return round(values[min(len(values) - 1, int(len(values) * pct / 100))] * 1000, 2)
+
+
+async def timed(session, stats, step, method, path, data=None, expect=(200,)):
+    start = time.perf_counter()
+    try:
+        status, body = await session.request(method, path, data)
+    except (OSError, asyncio.IncompleteReadError, ValueError) as exc:
+        stats.record(step, time.perf_counter() - start, f'{type(exc).__name__}: {exc}')
+        return None
+    if status not in expect:
+        stats.record(step, time.perf_counter() - start, f'HTTP {status} for {method} {path}')
+        return None
+    stats.record(step, time.perf_counter() - start)
+    return body
+
+
+async def login(session, stats, username):
+    page = await timed(session, stats, 'login', 'GET', '/login/')
+    match = CSRF_INPUT.search(page or b'')
+    if not match:
+        return False
+    data = {'csrfmiddlewaretoken': match.group(1).decode(), 'username': username, 'password': USER_PASSWORD}
+    return await timed(session, stats, 'login', 'POST', '/login/', data, expect=(302,)) is not None
+
+
+async def search(session, stats, step, data):
+    page = await timed(session, stats, 'search:form', 'GET', '/search/')
+    match = CSRF_INPUT.search(page or b'')
+    if match:
+        await timed(session, stats, step, 'POST', '/search/', {'csrfmiddlewaretoken': match.group(1).decode(), **data})
+
+
+async def scripted_journey(session, stats, rng, recipe_ids):
+    """One pass through list, detail, every search type and analytics"""
+    yield await timed(session, stats, 'list', 'GET', '/list/')
+    yield await timed(session, stats, 'detail', 'GET', f'/recipe/{rng.choice(recipe_ids)}/')
+    for step, data in SEARCHES.items():
+        yield await search(session, stats, step, data)
+    yield await timed(session, stats, 'search:show_all', 'GET', '/search/?show_all=1')
+    yield await timed(session, stats, 'analytics', 'GET', '/analytics/')
+
+
+async def replay_journey(session, stats, entries, offset):
+    """Walk the recorded URLs once, starting at ``offset``"""
+    for index in range(len(entries)):
+        method, path = entries[(offset + index) % len(entries)]
+        step = 'replay:' + (path.split('?')[0].strip('/').split('/')[0] or 'home')
+        if method == 'GET':
+            yield await timed(session, stats, step, 'GET', path)
+        elif path.startswith('/search'):
+            # Form bodies are not in access logs; replay POSTed searches as a name search
+            yield await search(session, stats, step, SEARCHES['search:name'])
+
+
+async def virtual_user(number, host, port, args, stats, deadline, recipe_ids, entries):
+    rng = random.Random(args.seed * 10007 + number)
+    session = Session(host, port)
+    try:
+        if not await login(session, stats, f'{USER_PREFIX}{number % args.accounts}'):
+            return
+        iterations = 0
+        while time.monotonic() < deadline and (not args.iterations or iterations < args.iterations):
+            if entries:
+                steps = replay_journey(session, stats, entries, rng.randrange(len(entries)))
+            else:
+                steps = scripted_journey(session, stats, rng, recipe_ids)
+            async for _ in steps:
+                if time.monotonic() >= deadline:
+                    break
+                if args.think_time:
+                    await asyncio.sleep(rng.uniform(0.5, 1.5) * args.think_time)
+            iterations += 1
+    finally:
+        await session.close()
+
+
+async def run_load(host, port, args, recipe_ids, entries):
+    stats = Stats()
+    start = time.monotonic()
+    deadline = start + args.duration
+
+    async def ramped(number):
+        # Spread user start-up over the ramp so logins do not arrive at once
+        await asyncio.sleep(args.ramp_up * number / args.users)
+        await virtual_user(number, host, port, args, stats, deadline, recipe_ids, entries)
+
+    await asyncio.gather(*(ramped(number) for number in range(args.users)))
+    return stats, time.monotonic() - start
+
+
+def read_replay(path):
+    entries = []
+    for line in Path(path).read_text().splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        match = LOG_REQUEST.search(line)
+        if match:
+            entries.append((match.group(1), match.group(2)))
+        elif line.startswith('/'):
+            entries.append(('GET', line.split()[0]))
+    if not entries:
+        raise SystemExit(f"No requests found in {path}")
+    return entries
+
+
+def setup_django(db_path=None):
+    if db_path is not None:
+        os.environ['DJANGO_SQLITE_PATH'] = str(db_path)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'recipe_project.settings')
+    sys.path.insert(0, str(SRC_DIR))
+    import django
+    django.setup()
+
+
+def create_users(count):
+    """Create the loaduser_N accounts, hashing the shared password only once"""
+    from django.contrib.auth.hashers import make_password
+    from django.contrib.auth.models import User
+
+    password = make_password(USER_PASSWORD)
+    existing = set(User.objects.filter(username__startswith=USER_PREFIX).values_list('username', flat=True))
+    User.objects.bulk_create(
+        User(username=f'{USER_PREFIX}{i}', password=password)
+        for i in range(count) if f'{USER_PREFIX}{i}' not in existing
+    )
+
+
+def recipe_sample():
+    from recipes.models import Recipe
+    ids = list(Recipe.objects.order_by('?').values_list('pk', flat=True)[:1000])
+    if not ids:
+        raise SystemExit("The database has no recipes; seed it with manage.py generate_catalog")
+    return ids
+
+
+def start_server(db_path, port, args):
+    env = dict(os.environ, DJANGO_SQLITE_PATH=str(db_path), DJANGO_PERF_MONITORING='0')
+    command = [sys.executable, '-m', 'uvicorn', 'recipe_project.asgi:application',
+               '--port', str(port), '--log-level', 'warning', '--workers', str(args.workers)]
+    process = subprocess.Popen(command, cwd=SRC_DIR, env=env)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("uvicorn did not start within 30 seconds")
+
+
+def report(rows, wall, args):
+    print(f"\n{args.users} users, {wall:.1f}s, think time {args.think_time}s")
+    print(f"{'step':<24}{'requests':>10}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}{'err %':>8}")
+    for step, row in rows.items():
+        print(
+            f"{step:<24}{row['requests']:>10}{row['rps']:>9.1f}{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}"
+            f"{row['p99_ms']:>10.1f}{row['errors']:>8}{row['error_rate'] * 100:>7.1f}%"
+        )
+    total = sum(row['requests'] for row in rows.values())
+    errors = sum(row['errors'] for row in rows.values())
+    print(f"{'total':<24}{total:>10}{total / wall:>9.1f}{'':>30}{errors:>8}{errors / max(total, 1) * 100:>7.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=10, help="Concurrent virtual users (default: 10)")
+    parser.add_argument('--duration', type=float, default=30, help="Seconds to run (default: 30)")
+    parser.add_argument('--iterations', type=int, default=0, help="Stop each user after this many journeys")
+    parser.add_argument('--think-time', type=float, default=1.0, help="Mean pause between steps in seconds")
+    parser.add_argument('--ramp-up', type=float, default=5.0, help="Seconds over which users start")
+    parser.add_argument('--replay', help="File of recorded URLs to replay instead of the scripted journey")
+    parser.add_argument('--url', help="Test this running server instead of starting one")
+    parser.add_argument('--create-users', action='store_true', help="With --url, add loaduser_N accounts to its database")
+    parser.add_argument('--accounts', type=int, default=50, help="Distinct login accounts (default: 50)")
+    parser.add_argument('--recipes', type=int, default=2000, help="Recipes to seed in the scratch database")
+    parser.add_argument('--workers', type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed")
+    parser.add_argument('--output', help="Write per-step results as JSON")
+    args = parser.parse_args()
+
+    entries = read_replay(args.replay) if args.replay else None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server = None
+        if args.url:
+            target = urlsplit(args.url)
+            host, port = target.hostname, target.port or 80
+            setup_django()
+            if args.create_users:
+                create_users(args.accounts)
+        else:
+            db_path = Path(tmp) / 'load.sqlite3'
+            env = dict(os.environ, DJANGO_SQLITE_PATH=str(db_path))
+            subprocess.run([sys.executable, 'manage.py', 'migrate', '--verbosity', '0'], cwd=SRC_DIR, env=env, check=True)
+            subprocess.run(
+                [sys.executable, 'manage.py', 'generate_catalog', '--recipes', str(args.recipes), '--seed', str(args.seed)],
+                cwd=SRC_DIR, env=env, check=True, stdout=subprocess.DEVNULL,
+            )
+            setup_django(db_path)
+            create_users(args.accounts)
+            with socket.socket() as sock:
+                sock.bind(('127.0.0.1', 0))
+                host, port = '127.0.0.1', sock.getsockname()[1]
+            server = start_server(db_path, port, args)
+
+        try:
+            recipe_ids = recipe_sample()
+            print(f"Load test against {host}:{port}: {args.users} users for up to {args.duration:.0f}s")
+            stats, wall = asyncio.run(run_load(host, port, args, recipe_ids, entries))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+    rows = stats.summary(wall)
+    report(rows, wall, args)
+    for step, sample in stats.error_samples.items():
+        print(f"  first {step} error: {sample}")
+    if args.output:
+        Path(args.output).write_text(json.dumps({'users': args.users, 'wall_s': round(wall, 2), 'steps': rows}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Benchmark harness for the recipe views
+
+Seeds a scratch SQLite database with synthetic catalogs of increasing size and
+measures, for each scenario, latency percentiles, SQL query count and peak
+Python memory of one request. Scenarios cover recipe_list, recipe_detail,
+analytics_view and search_recipes with every combination of its four filters
+(name, ingredient, difficulty, cooking time) plus "show all".
+
+Everything runs in-process with Django's test client, so no server or network
+is needed. Results are written as JSON and can be compared with a stored
+baseline to see the effect of an optimization.
+
+Usage (from the src directory):
+    python benchmarks/run_benchmarks.py --sizes 1000 --repeat 20
+    python benchmarks/run_benchmarks.py --sizes 1000,100000 --output results.json
+    python benchmarks/run_benchmarks.py --baseline benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --save-baseline benchmarks/baseline.json
+
+Note: recipe_list, search "show all" and analytics_view render every recipe,
+so at 1M recipes they take minutes and gigabytes; use --scenarios to skip them.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent
+
+SEARCH_FILTERS = {
+    'name': ('recipe_name', 'Recipe 1'),
+    'ingredient': ('ingredients', 'Ingredient 1'),
+    'difficulty': ('difficulty', 'medium'),
+    'cooking_time': ('cooking_time', 'quick'),
+}
+
+
+def setup_django(db_path):
+    os.environ['DJANGO_SQLITE_PATH'] = str(db_path)
+    os.environ['DJANGO_VIEW_CACHE_TIMEOUT'] = '0'  # measure the views, not the cache
+    os.environ['DJANGO_PERF_MONITORING'] = '0'
+    os.environ['DJANGO_METRICS'] = '0'
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'recipe_project.settings')
+    sys.path.insert(0, str(SRC_DIR))
+    import django
+    django.setup()
+
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+
+
+def seed_catalog(size, state):
+    """Grow the catalog to ``size`` recipes with a few ingredients each"""
+    from django.contrib.auth.models import User
+    from recipes.models import Category, Recipe
+    from ingredients.models import Ingredient, RecipeIngredient
+
+    if 'user' not in state:
+        state['user'] = User.objects.create_user(username='benchuser', password='benchpass123')
+        state['categories'] = Category.objects.bulk_create(Category(name=f"Category {i}") for i in range(20))
+        state['ingredients'] = Ingredient.objects.bulk_create(Ingredient(name=f"Ingredient {i}") for i in range(500))
+        state['seeded'] = 0
+
+    batch_size = 5000
+    for start in range(state['seeded'], size, batch_size):
+        stop = min(start + batch_size, size)
+        recipes = Recipe.objects.bulk_create(
+            Recipe(
+                name=f"Recipe {i}",
+                cooking_time=5 + (i * 13) % 120,
+                difficulty='Medium',
+                user=state['user'],
+                category=state['categories'][i % 20] if i % 7 else None,
+            )
+            for i in range(start, stop)
+        )
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(
+                recipe=recipe,
+                ingredient=state['ingredients'][(recipe.pk * 7 + offset) % 500],
+                quantity=offset or None,
+            )
+            for recipe in recipes
+            for offset in range(1 + recipe.pk % 8)
+        )
+    state['seeded'] = size
+
+
+def build_scenarios():
+    """Return {name: (method, url, data)} for every benchmarked request"""
+    from django.urls import reverse
+    from recipes.models import Recipe
+
+    detail_pk = Recipe.objects.order_by('-pk').values_list('pk', flat=True).first()
+    search_url = reverse('recipes:search')
+    scenarios = {
+        'list': ('get', reverse('recipes:list'), None),
+        'detail': ('get', reverse('recipes:detail', args=[detail_pk]), None),
+        'analytics': ('get', reverse('recipes:analytics'), None),
+        'search:show_all': ('get', search_url + '?show_all=1', None),
+    }
+    for count in range(1, len(SEARCH_FILTERS) + 1):
+        for combination in itertools.combinations(SEARCH_FILTERS, count):
+            data = dict(SEARCH_FILTERS[name] for name in combination)
+            scenarios['search:' + '+'.join(combination)] = ('post', search_url, data)
+    return scenarios
+
+
+def measure(client, method, url, data, repeat):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    def request():
+        response = getattr(client, method)(url, data or {})
+        if response.status_code != 200:
+            raise RuntimeError(f"{method.upper()} {url} returned {response.status_code}")
+
+    request()  # warm up caches and lazy imports
+
+    with CaptureQueriesContext(connection) as queries:
+        request()
+    # Read now: with DEBUG on, later requests rotate the bounded query log
+    query_count = len(queries.captured_queries)
+
+    tracemalloc.start()
+    request()
+    peak_bytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        request()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+
+    def pct(p):
+        return round(timings[min(len(timings) - 1, int(len(timings) * p / 100))], 3)
+
+    return {
+        'p50_ms': pct(50),
+        'p95_ms': pct(95),
+        'p99_ms': pct(99),
+        'mean_ms': round(statistics.mean(timings), 3),
+        'queries': query_count,
+        'peak_kb': round(peak_bytes / 1024, 1),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Print p50 changes against the baseline and return the regressions"""
+    regressions = []
+    print(f"\n{'scenario':<46}{'size':>9}{'base p50':>11}{'now p50':>11}{'change':>9}")
+    for size, scenarios in results['results'].items():
+        for name, current in scenarios.items():
+            previous = baseline.get('results', {}).get(size, {}).get(name)
+            if not previous or not previous['p50_ms']:
+                continue
+            change = current['p50_ms'] / previous['p50_ms'] - 1
+            flag = ''
+            if change > tolerance or current['queries'] > previous['queries']:
+                flag = '  REGRESSION'
+                regressions.append((size, name))
+            print(f"{name:<46}{size:>9}{previous['p50_ms']:>11.2f}{current['p50_ms']:>11.2f}{change:>+9.0%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='1000', help="Comma-separated catalog sizes (e.g. 1000,100000,1000000)")
+    parser.add_argument('--repeat', type=int, default=10, help="Timed requests per scenario")
+    parser.add_argument('--scenarios', help="Comma-separated scenario name prefixes to run (default: all)")
+    parser.add_argument('--output', help="Write JSON results to this file")
+    parser.add_argument('--baseline', help="Compare against a stored baseline JSON file")
+    parser.add_argument('--save-baseline', help="Store these results as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed p50 slowdown vs baseline (default: 0.2)")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    prefixes = args.scenarios.split(',') if args.scenarios else None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(Path(tmp) / 'bench.sqlite3')
+        from django.test import Client
+
+        state = {}
+        results = {
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'repeat': args.repeat,
+            'results': {},
+        }
+        for size in sizes:
+            started = time.perf_counter()
+            seed_catalog(size, state)
+            print(f"Seeded {size} recipes in {time.perf_counter() - started:.1f}s")
+
+            client = Client(HTTP_HOST='localhost')
+            client.force_login(state['user'])
+            size_results = results['results'][str(size)] = {}
+            for name, (method, url, data) in build_scenarios().items():
+                if prefixes and not any(name.startswith(prefix) for prefix in prefixes):
+                    continue
+                size_results[name] = measure(client, method, url, data, args.repeat)
+                row = size_results[name]
+                print(
+                    f"  {name:<44} p50 {row['p50_ms']:>9.2f} ms  p99 {row['p99_ms']:>9.2f} ms  "
+                    f"{row['queries']:>4} queries  {row['peak_kb']:>10.1f} KiB"
+                )
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(output)
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(output)
+        print(f"\nBaseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        regressions = compare(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} scenario(s) regressed beyond {args.tolerance:.0%}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
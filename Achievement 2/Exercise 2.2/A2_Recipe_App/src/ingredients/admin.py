@@ -1,10 +1,16 @@
+from django import forms
 from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.db.models import Q
 from .models import Ingredient, RecipeIngredient
+from recipes.autocomplete import AutocompleteListFilter, PrefixAutocompleteMixin, prefix_q
+from recipes.models import Recipe
+from recipes.paginator import EstimatedCountPaginator
 
 # Register your models here.
 
 @admin.register(Ingredient)
-class IngredientAdmin(admin.ModelAdmin):
+class IngredientAdmin(PrefixAutocompleteMixin, admin.ModelAdmin):
     list_display = ('name', 'unit_of_measure')
     search_fields = ('name',)
     list_filter = ('unit_of_measure',)
@@ -12,8 +18,30 @@ class IngredientAdmin(admin.ModelAdmin):
 @admin.register(RecipeIngredient)
 class RecipeIngredientAdmin(admin.ModelAdmin):
     list_display = ('recipe', 'ingredient', 'get_quantity_display')
-    list_filter = ('ingredient', 'recipe')
+    # Autocomplete boxes instead of a sidebar entry per ingredient and recipe
+    list_filter = (('ingredient', AutocompleteListFilter), ('recipe', AutocompleteListFilter))
+    list_select_related = ('recipe', 'ingredient')
+    autocomplete_fields = ('recipe', 'ingredient')
     search_fields = ('recipe__name', 'ingredient__name')
+    search_help_text = "Recipe or ingredient names starting with the search term"
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    
+    @property
+    def media(self):
+        autocomplete = AutocompleteSelect(RecipeIngredient._meta.get_field('ingredient'), self.admin_site)
+        return super().media + autocomplete.media + forms.Media(js=['recipes/admin/autocomplete_list_filter.js'])
+    
+    def get_search_results(self, request, queryset, search_term):
+        """Match name prefixes through the name indexes instead of LIKE '%term%' over joins"""
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        queryset = queryset.filter(
+            Q(ingredient__in=Ingredient.objects.filter(prefix_q('name', term)).values('pk'))
+            | Q(recipe__in=Recipe.objects.filter(prefix_q('name', term)).values('pk'))
+        )
+        return queryset, False
     
     def get_quantity_display(self, obj):
         """Display quantity with unit or 'No quantity specified'"""
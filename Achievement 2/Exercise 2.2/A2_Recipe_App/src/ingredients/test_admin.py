@@ -0,0 +1,163 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .models import Ingredient, RecipeIngredient
+from recipes.autocomplete import prefix_q
+from recipes.models import Recipe
+
+
+class IngredientAutocompleteTest(TestCase):
+    """Test autocomplete lookups used by the ingredient inline and RecipeIngredientAdmin"""
+
+    def setUp(self):
+        """Set up an admin user, a recipe and an ingredient vocabulary"""
+        cache.clear()
+        self.admin = User.objects.create_superuser(username='admin', password='adminpass123')
+        self.recipe = Recipe.objects.create(name="Garlic Bread", cooking_time=15, user=self.admin)
+        Ingredient.objects.bulk_create(Ingredient(name=f"Garlic {i:02d}") for i in range(30))
+        Ingredient.objects.bulk_create([Ingredient(name="Vinegar"), Ingredient(name="garam masala")])
+        self.client = Client()
+        self.client.login(username='admin', password='adminpass123')
+
+    def autocomplete(self, term, field_name='ingredient', page=1):
+        response = self.client.get(reverse('admin:autocomplete'), {
+            'term': term, 'app_label': 'ingredients', 'model_name': 'recipeingredient',
+            'field_name': field_name, 'page': page,
+        })
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_prefix_match_only(self):
+        """Test that terms match name prefixes, not substrings"""
+        self.assertEqual(self.autocomplete('egar')['results'], [])
+        names = [result['text'] for result in self.autocomplete('gara')['results']]
+        self.assertEqual(names, ["garam masala (grams)"])
+
+    def test_case_insensitive_prefix(self):
+        """Test that lower-case input finds capitalized names"""
+        data = self.autocomplete('garlic')
+        self.assertEqual(data['results'][0]['text'], "Garlic 00 (grams)")
+
+    def test_paginated_results(self):
+        """Test that results come back a page at a time"""
+        first = self.autocomplete('gar')
+        self.assertEqual(len(first['results']), 20)
+        self.assertTrue(first['pagination']['more'])
+        second = self.autocomplete('gar', page=2)
+        self.assertEqual(len(second['results']), 11)
+        self.assertFalse(second['pagination']['more'])
+
+    def test_uses_range_lookup(self):
+        """Test that the lookup is a range the name index can serve"""
+        with CaptureQueriesContext(connection) as queries:
+            self.autocomplete('gar')
+        sql = next(query['sql'] for query in queries.captured_queries if 'ingredients_ingredient' in query['sql'])
+        self.assertIn('>=', sql)
+        self.assertNotIn('LIKE', sql)
+
+    def test_recipe_autocomplete(self):
+        """Test that RecipeIngredientAdmin can look up recipes by name"""
+        names = [result['text'] for result in self.autocomplete('garlic b', field_name='recipe')['results']]
+        self.assertEqual(names, ["Garlic Bread"])
+
+    def test_change_form_does_not_list_ingredients(self):
+        """Test that the recipe change form does not render the ingredient vocabulary"""
+        RecipeIngredient.objects.create(recipe=self.recipe, ingredient=Ingredient.objects.get(name="Garlic 05"))
+        url = reverse('admin:recipes_recipe_change', args=[self.recipe.pk])
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as small:
+            response = self.client.get(url)
+        self.assertContains(response, "Garlic 05")
+        self.assertNotContains(response, "Garlic 06")
+
+        Ingredient.objects.bulk_create(Ingredient(name=f"Extra {i}") for i in range(500))
+        with CaptureQueriesContext(connection) as large:
+            self.client.get(url)
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+    def test_prefix_q_handles_single_character(self):
+        """Test the range bounds for a one-letter term"""
+        self.assertEqual(Ingredient.objects.filter(prefix_q('name', 'v')).get().name, "Vinegar")
+
+
+class RecipeIngredientAdminTest(TestCase):
+    """Test the RecipeIngredient changelist on a large link table"""
+
+    def setUp(self):
+        """Set up an admin user, recipes and links"""
+        cache.clear()
+        self.admin = User.objects.create_superuser(username='admin', password='adminpass123')
+        self.ingredients = Ingredient.objects.bulk_create(Ingredient(name=f"Spice {i:02d}") for i in range(20))
+        Ingredient.objects.create(name="Unused Herb")
+        self.recipes = []
+        self.client = Client()
+        self.client.login(username='admin', password='adminpass123')
+        self.url = reverse('admin:ingredients_recipeingredient_changelist')
+
+    def seed_links(self, recipe_count):
+        start = len(self.recipes)
+        self.recipes += Recipe.objects.bulk_create(
+            Recipe(name=f"Stew {i}", cooking_time=30, user=self.admin) for i in range(start, recipe_count)
+        )
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(recipe=recipe, ingredient=self.ingredients[(recipe.pk + offset) % 20], quantity=offset or None)
+            for recipe in self.recipes[start:]
+            for offset in range(3)
+        )
+
+    def count_queries(self, url):
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries.captured_queries), response
+
+    def test_sidebar_does_not_list_every_choice(self):
+        """Test that the filters render autocomplete boxes, not every ingredient and recipe"""
+        self.seed_links(5)
+        _, response = self.count_queries(self.url)
+        self.assertContains(response, 'autocomplete-list-filter', count=2)
+        self.assertNotContains(response, "Unused Herb")
+
+    def test_constant_queries(self):
+        """Test that the changelist query count does not grow with the number of links"""
+        self.seed_links(10)
+        small, _ = self.count_queries(self.url)
+        self.seed_links(200)
+        large, _ = self.count_queries(self.url)
+        self.assertEqual(small, large)
+
+    def test_filtered_count_is_cached(self):
+        """Test that the selected ingredient's link count is cached between loads"""
+        self.seed_links(20)
+        ingredient = self.ingredients[0]
+        url = f'{self.url}?ingredient__id__exact={ingredient.pk}'
+        expected = RecipeIngredient.objects.filter(ingredient=ingredient).count()
+        response = self.client.get(url)
+        self.assertContains(response, f"{ingredient} ({expected:,})")
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        counts = [query for query in queries.captured_queries if 'COUNT(' in query['sql']]
+        # Only the paginator's count of the filtered page remains
+        self.assertEqual(len(counts), 1)
+
+    def test_count_refreshed_after_change(self):
+        """Test that adding a link invalidates the cached count"""
+        self.seed_links(5)
+        ingredient = Ingredient.objects.get(name="Unused Herb")
+        url = f'{self.url}?ingredient__id__exact={ingredient.pk}'
+        self.assertContains(self.client.get(url), "Unused Herb (grams) (0)")
+        RecipeIngredient.objects.create(recipe=self.recipes[0], ingredient=ingredient)
+        self.assertContains(self.client.get(url), "Unused Herb (grams) (1)")
+
+    def test_prefix_search(self):
+        """Test that search matches recipe and ingredient name prefixes"""
+        self.seed_links(5)
+        response = self.client.get(self.url, {'q': 'stew 3'})
+        self.assertEqual(response.context['cl'].result_count, 3)
+        response = self.client.get(self.url, {'q': 'ew'})
+        self.assertEqual(response.context['cl'].result_count, 0)
@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+
+
+class MonitoringConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'monitoring'
+
+    def ready(self):
+        # Track connections opened by any thread for the open connections gauge
+        from .metrics import track_connection
+
+        connection_created.connect(track_connection, dispatch_uid='monitoring_track_connection')
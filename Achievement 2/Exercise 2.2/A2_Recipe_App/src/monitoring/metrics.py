@@ -0,0 +1,279 @@
+"""
+Request metrics in Prometheus text format.
+
+Each process keeps its own counters in memory; recording a sample only takes
+a short per-process lock around a few dict updates. When ``METRICS_DIR`` is
+set, every process also writes its counters to ``METRICS_DIR/metrics_<pid>.json``
+(at most once per ``METRICS_FLUSH_INTERVAL`` seconds, atomically via rename),
+and the metrics endpoint merges the files of all workers. Without
+``METRICS_DIR`` only the serving process is reported. The file of a worker
+that has exited is taken over by the process serving the endpoint: its
+counters are added to that process's own and the file is deleted, so counters
+never go backwards and the directory does not fill up with dead workers.
+
+Exposed metrics:
+
+* ``recipe_http_requests_total{view, method, status}``
+* ``recipe_http_request_errors_total{view}`` (5xx responses)
+* ``recipe_http_request_duration_seconds{view}`` histogram
+* ``recipe_view_cache_requests_total{result}`` and ``recipe_view_cache_hit_ratio``
+* ``recipe_db_connections_open{alias}`` open connections of every thread in
+  the live processes, tracked through the ``connection_created`` signal
+"""
+
+import json
+import os
+import threading
+import time
+import weakref
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+# Database wrappers that have connected in this process, in any thread. A
+# wrapper disappears once its thread is gone; connection is None once closed.
+_connections_lock = threading.Lock()
+_tracked_connections = weakref.WeakSet()
+
+
+def _empty_histogram():
+    return {'buckets': [0] * len(DURATION_BUCKETS), 'sum': 0.0, 'count': 0}
+
+
+def track_connection(sender, connection, **kwargs):
+    """Remember a newly opened connection (connected to ``connection_created``)"""
+    with _connections_lock:
+        _tracked_connections.add(connection)
+
+
+def open_connections():
+    """Count the open connections of every thread in this process by alias"""
+    counts = {alias: 0 for alias in connections}
+    with _connections_lock:
+        wrappers = list(_tracked_connections)
+    for wrapper in wrappers:
+        if wrapper.connection is not None:
+            counts[wrapper.alias] = counts.get(wrapper.alias, 0) + 1
+    return counts
+
+
+def _add_counters(target, snapshot):
+    """Add the counters of a snapshot to target (same keys, defaultdicts)"""
+    for key, value in snapshot['requests'].items():
+        target['requests'][key] += value
+    for view, value in snapshot['errors'].items():
+        target['errors'][view] += value
+    for view, histogram in snapshot['durations'].items():
+        total = target['durations'][view]
+        total['sum'] += histogram['sum']
+        total['count'] += histogram['count']
+        for index, value in enumerate(histogram['buckets']):
+            total['buckets'][index] += value
+    for result in ('hit', 'miss'):
+        target['cache'][result] += snapshot['cache'].get(result, 0)
+
+
+class MetricsRegistry:
+    """Per-process metric store"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_flush = 0.0
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = defaultdict(int)
+            self.errors = defaultdict(int)
+            self.durations = defaultdict(_empty_histogram)
+            self.cache = {'hit': 0, 'miss': 0}
+
+    def observe_request(self, view, method, status, duration):
+        with self._lock:
+            self.requests[f'{view}|{method}|{status}'] += 1
+            if status >= 500:
+                self.errors[view] += 1
+            histogram = self.durations[view]
+            histogram['sum'] += duration
+            histogram['count'] += 1
+            for index, bound in enumerate(DURATION_BUCKETS):
+                if duration <= bound:
+                    histogram['buckets'][index] += 1
+                    break
+        self.maybe_flush()
+
+    def record_cache(self, hit):
+        with self._lock:
+            self.cache['hit' if hit else 'miss'] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'pid': os.getpid(),
+                'requests': dict(self.requests),
+                'errors': dict(self.errors),
+                'durations': {view: {**h, 'buckets': list(h['buckets'])} for view, h in self.durations.items()},
+                'cache': dict(self.cache),
+                'db_connections': open_connections(),
+            }
+
+    def adopt(self, path):
+        """
+        Take over the counters in an exited worker's file and delete it.
+
+        The file is first renamed to a name only this process uses, so when
+        several workers find it at once only one of them adds its counters.
+
+        Returns True if this process took the file over.
+        """
+        claimed = path.with_name(f'{path.name}.{os.getpid()}.adopted')
+        try:
+            os.rename(path, claimed)
+        except FileNotFoundError:
+            return False
+        try:
+            snapshot = json.loads(claimed.read_text())
+        except (OSError, ValueError):
+            snapshot = None
+        if snapshot:
+            with self._lock:
+                _add_counters({
+                    'requests': self.requests,
+                    'errors': self.errors,
+                    'durations': self.durations,
+                    'cache': self.cache,
+                }, snapshot)
+        claimed.unlink()
+        return True
+
+    def maybe_flush(self):
+        metrics_dir = getattr(settings, 'METRICS_DIR', None)
+        if not metrics_dir:
+            return
+        now = time.monotonic()
+        if now - self._last_flush < getattr(settings, 'METRICS_FLUSH_INTERVAL', 1.0):
+            return
+        self._last_flush = now
+        self.flush(metrics_dir)
+
+    def flush(self, metrics_dir):
+        """Atomically write this process's counters to the shared directory"""
+        directory = Path(metrics_dir)
+        directory.mkdir(parents=True, exist_ok=True)
+        target = directory / f'metrics_{os.getpid()}.json'
+        tmp = target.with_suffix(f'.tmp{threading.get_ident()}')
+        tmp.write_text(json.dumps(self.snapshot()))
+        os.replace(tmp, target)
+
+
+registry = MetricsRegistry()
+
+
+def record_cache_access(hit):
+    """Count a view-cache lookup (called from recipes.cache)"""
+    registry.record_cache(hit)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def collect():
+    """Return snapshots for this process and every other live worker on disk"""
+    snapshots = []
+    metrics_dir = getattr(settings, 'METRICS_DIR', None)
+    if metrics_dir and os.path.isdir(metrics_dir):
+        adopted = False
+        for path in Path(metrics_dir).glob('metrics_*.json'):
+            try:
+                snapshot = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            pid = snapshot.get('pid')
+            if pid == os.getpid():
+                continue
+            # Counters outlive their process, connection gauges do not
+            if _pid_alive(pid):
+                snapshots.append(snapshot)
+            elif registry.adopt(path):
+                adopted = True
+        if adopted:
+            registry.flush(metrics_dir)
+    return [registry.snapshot()] + snapshots
+
+
+def merge(snapshots):
+    merged = {
+        'requests': defaultdict(int),
+        'errors': defaultdict(int),
+        'durations': defaultdict(_empty_histogram),
+        'cache': {'hit': 0, 'miss': 0},
+        'db_connections': defaultdict(int),
+    }
+    for snapshot in snapshots:
+        _add_counters(merged, snapshot)
+        for alias, value in snapshot['db_connections'].items():
+            merged['db_connections'][alias] += value
+    return merged
+
+
+def _labels(**labels):
+    return ','.join(f'{name}="{value}"' for name, value in labels.items())
+
+
+def render_prometheus(merged):
+    """Render merged metrics in the Prometheus text exposition format"""
+    lines = [
+        '# HELP recipe_http_requests_total Requests by URL name, method and status.',
+        '# TYPE recipe_http_requests_total counter',
+    ]
+    for key, value in sorted(merged['requests'].items()):
+        view, method, status = key.split('|')
+        lines.append(f'recipe_http_requests_total{{{_labels(view=view, method=method, status=status)}}} {value}')
+
+    lines += [
+        '# HELP recipe_http_request_errors_total Requests that ended in a 5xx response.',
+        '# TYPE recipe_http_request_errors_total counter',
+    ]
+    for view, value in sorted(merged['errors'].items()):
+        lines.append(f'recipe_http_request_errors_total{{{_labels(view=view)}}} {value}')
+
+    lines += [
+        '# HELP recipe_http_request_duration_seconds Request latency by URL name.',
+        '# TYPE recipe_http_request_duration_seconds histogram',
+    ]
+    for view, histogram in sorted(merged['durations'].items()):
+        cumulative = 0
+        for bound, value in zip(DURATION_BUCKETS, histogram['buckets']):
+            cumulative += value
+            lines.append(f'recipe_http_request_duration_seconds_bucket{{{_labels(view=view, le=bound)}}} {cumulative}')
+        lines.append(f'recipe_http_request_duration_seconds_bucket{{{_labels(view=view, le="+Inf")}}} {histogram["count"]}')
+        lines.append(f'recipe_http_request_duration_seconds_sum{{{_labels(view=view)}}} {histogram["sum"]:.6f}')
+        lines.append(f'recipe_http_request_duration_seconds_count{{{_labels(view=view)}}} {histogram["count"]}')
+
+    hits, misses = merged['cache']['hit'], merged['cache']['miss']
+    lines += [
+        '# HELP recipe_view_cache_requests_total Recipe view cache lookups.',
+        '# TYPE recipe_view_cache_requests_total counter',
+        f'recipe_view_cache_requests_total{{result="hit"}} {hits}',
+        f'recipe_view_cache_requests_total{{result="miss"}} {misses}',
+        '# HELP recipe_view_cache_hit_ratio Share of recipe view cache lookups that hit.',
+        '# TYPE recipe_view_cache_hit_ratio gauge',
+        f'recipe_view_cache_hit_ratio {hits / (hits + misses) if hits + misses else 0:.4f}',
+        '# HELP recipe_db_connections_open Open database connections across live workers.',
+        '# TYPE recipe_db_connections_open gauge',
+    ]
+    for alias, value in sorted(merged['db_connections'].items()):
+        lines.append(f'recipe_db_connections_open{{{_labels(alias=alias)}}} {value}')
+    return '\n'.join(lines) + '\n'
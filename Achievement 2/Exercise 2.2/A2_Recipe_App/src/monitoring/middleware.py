@@ -0,0 +1,214 @@
+"""
+Per-request performance instrumentation.
+
+PerformanceMiddleware records, for every request:
+
+* wall time of the whole middleware/view stack
+* number of SQL queries and total SQL time (via a wrapper installed in
+  ``connection.execute_wrappers`` of every database connection)
+* template render time (via the ``monitoring.template_backend.TimedDjangoTemplates``
+  template backend configured in ``TEMPLATES``)
+* response size
+
+and reports them as a ``Server-Timing`` header and as one JSON log line on the
+``monitoring.performance`` logger. Requests slower than
+``PERF_SLOW_REQUEST_MS`` or running more than ``PERF_MAX_QUERIES`` queries are
+logged at WARNING level with ``"slow": true``.
+
+Both timers only count while a request is being measured: the stats live in
+a context variable, which ``sync_to_async`` carries over to the threads async
+views run their queries and renders in. The middleware works in sync and
+async stacks, so async views under ASGI stay on the event loop.
+
+When ``PERF_MONITORING_ENABLED`` is False the middleware removes itself from
+the stack at startup (``MiddlewareNotUsed``), so it costs nothing.
+
+MetricsMiddleware feeds the Prometheus metrics in ``monitoring/metrics.py``
+and is controlled separately by ``METRICS_ENABLED``.
+"""
+
+import json
+import logging
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.db.backends.signals import connection_created
+
+from .metrics import registry
+
+logger = logging.getLogger('monitoring.performance')
+
+# Stats for the request currently being handled, if any
+_current_stats = ContextVar('performance_stats', default=None)
+
+
+class RequestStats:
+    """Timings collected for a single request"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.total_ms = 0.0
+        self.query_count = 0
+        self.query_ms = 0.0
+        self.template_ms = 0.0
+        self.response_bytes = None
+
+    def as_dict(self):
+        return {
+            'total_ms': round(self.total_ms, 2),
+            'queries': self.query_count,
+            'query_ms': round(self.query_ms, 2),
+            'template_ms': round(self.template_ms, 2),
+            'response_bytes': self.response_bytes,
+        }
+
+
+def _sql_timer(execute, sql, params, many, context):
+    stats = _current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.query_count += 1
+        stats.query_ms += (time.perf_counter() - start) * 1000
+
+
+def time_template_render(render, *args):
+    """Call a template's render function, adding its duration to the current request's stats"""
+    stats = _current_stats.get()
+    if stats is None:
+        return render(*args)
+    start = time.perf_counter()
+    try:
+        return render(*args)
+    finally:
+        stats.template_ms += (time.perf_counter() - start) * 1000
+
+
+def _install_sql_timer(connection, **kwargs):
+    """Add the SQL timer to a database connection's execute wrappers once"""
+    if _sql_timer not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_sql_timer)
+
+
+class PerformanceMiddleware:
+    """Record per-request timings and expose them as Server-Timing headers"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PERF_MONITORING_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_request_ms = getattr(settings, 'PERF_SLOW_REQUEST_MS', 500)
+        self.max_queries = getattr(settings, 'PERF_MAX_QUERIES', 50)
+        # Connections opened later, e.g. in the threads async views query from
+        connection_created.connect(_install_sql_timer, dispatch_uid='monitoring.performance')
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        _install_sql_timer(connection)
+        stats, token = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            self.stop(stats, token)
+        return self.finish(request, response, stats)
+
+    async def __acall__(self, request):
+        stats, token = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            self.stop(stats, token)
+        return self.finish(request, response, stats)
+
+    @staticmethod
+    def start(request):
+        stats = RequestStats()
+        request.performance = stats
+        return stats, _current_stats.set(stats)
+
+    @staticmethod
+    def stop(stats, token):
+        _current_stats.reset(token)
+        stats.total_ms = (time.perf_counter() - stats.start) * 1000
+
+    def finish(self, request, response, stats):
+        if not response.streaming:
+            stats.response_bytes = len(response.content)
+        response['Server-Timing'] = self.server_timing(stats)
+        self.log(request, response, stats)
+        return response
+
+    @staticmethod
+    def server_timing(stats):
+        return ', '.join([
+            f'total;dur={stats.total_ms:.1f}',
+            f'db;dur={stats.query_ms:.1f};desc="{stats.query_count} queries"',
+            f'tpl;dur={stats.template_ms:.1f}',
+        ])
+
+    def is_slow(self, stats):
+        return stats.total_ms > self.slow_request_ms or stats.query_count > self.max_queries
+
+    def log(self, request, response, stats):
+        slow = self.is_slow(stats)
+        level = logging.WARNING if slow else logging.INFO
+        if not logger.isEnabledFor(level):
+            return
+        match = getattr(request, 'resolver_match', None)
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            **stats.as_dict(),
+            'slow': slow,
+        }
+        logger.log(level, json.dumps(record))
+
+
+class MetricsMiddleware:
+    """Count requests and observe latency per resolved URL name"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'METRICS_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        start = time.perf_counter()
+        response = self.get_response(request)
+        return self.observe(request, response, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        return self.observe(request, response, time.perf_counter() - start)
+
+    @staticmethod
+    def observe(request, response, duration):
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else '<unresolved>'
+        registry.observe_request(view, request.method, response.status_code, duration)
+        return response
@@ -0,0 +1,28 @@
+"""
+Django template backend that reports render time to PerformanceMiddleware.
+
+Configured as the ``BACKEND`` in ``TEMPLATES`` instead of the stock
+``DjangoTemplates``. Templates render exactly as before; while a request is
+being measured, the time spent in ``render()`` is added to its stats.
+"""
+
+from django.template.backends.django import DjangoTemplates, Template
+
+from .middleware import time_template_render
+
+
+class TimedTemplate(Template):
+    """Django template whose render() is timed"""
+
+    def render(self, context=None, request=None):
+        return time_template_render(super().render, context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates backend returning TimedTemplate instances"""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
@@ -0,0 +1,208 @@
+import gc
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+
+from asgiref.sync import iscoroutinefunction
+from django.test import TestCase, Client, RequestFactory, AsyncRequestFactory, override_settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import HttpResponse
+from django.urls import reverse
+
+from recipes.models import Recipe
+from . import metrics
+from .middleware import MetricsMiddleware, PerformanceMiddleware
+
+
+@override_settings(PERF_MONITORING_ENABLED=True, PERF_SLOW_REQUEST_MS=500, PERF_MAX_QUERIES=50)
+class PerformanceMiddlewareTest(TestCase):
+    """Test per-request timing headers and log lines"""
+
+    def setUp(self):
+        """Set up a logged-in user and a recipe"""
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.recipe = Recipe.objects.create(name="Toast", cooking_time=5, user=self.user)
+        self.client = Client()
+        self.client.login(username='testuser', password='testpassword')
+
+    def test_server_timing_header(self):
+        """Test that responses carry total, db and template timings"""
+        response = self.client.get(reverse('recipes:detail', args=[self.recipe.pk]))
+        header = response['Server-Timing']
+        self.assertIn('total;dur=', header)
+        self.assertIn('db;dur=', header)
+        self.assertIn('tpl;dur=', header)
+
+    def test_log_line_records_queries_and_size(self):
+        """Test that the structured log line reflects the request"""
+        with self.assertLogs('monitoring.performance', level='INFO') as logs:
+            response = self.client.get(reverse('recipes:detail', args=[self.recipe.pk]))
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(record['view'], 'recipes:detail')
+        self.assertEqual(record['status'], 200)
+        self.assertGreater(record['queries'], 0)
+        self.assertGreater(record['template_ms'], 0)
+        self.assertEqual(record['response_bytes'], len(response.content))
+        self.assertFalse(record['slow'])
+
+    @override_settings(PERF_MAX_QUERIES=0)
+    def test_slow_request_flagged(self):
+        """Test that requests over the query threshold are logged as slow"""
+        with self.assertLogs('monitoring.performance', level='WARNING') as logs:
+            self.client.get(reverse('recipes:detail', args=[self.recipe.pk]))
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertTrue(record['slow'])
+
+    @override_settings(PERF_MONITORING_ENABLED=False)
+    def test_disabled_middleware_not_used(self):
+        """Test that the middleware removes itself when disabled"""
+        with self.assertRaises(MiddlewareNotUsed):
+            PerformanceMiddleware(lambda request: HttpResponse())
+
+    def test_request_stats_attached(self):
+        """Test that views can read the stats collected so far"""
+        middleware = PerformanceMiddleware(lambda request: HttpResponse("ok"))
+        request = RequestFactory().get('/')
+        response = middleware(request)
+        self.assertEqual(request.performance.response_bytes, 2)
+        self.assertIn('Server-Timing', response)
+
+    async def test_async_stack(self):
+        """Test that the middleware stays async in front of an async handler"""
+        async def get_response(request):
+            return HttpResponse("ok")
+
+        middleware = PerformanceMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+        request = AsyncRequestFactory().get('/')
+        response = await middleware(request)
+        self.assertEqual(request.performance.response_bytes, 2)
+        self.assertIn('Server-Timing', response)
+
+
+@override_settings(METRICS_DIR=None)
+class MetricsEndpointTest(TestCase):
+    """Test the Prometheus metrics endpoint"""
+
+    def setUp(self):
+        """Set up a logged-in user and reset the metric counters"""
+        cache.clear()
+        metrics.registry.reset()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client = Client()
+        self.client.login(username='testuser', password='testpassword')
+
+    def test_requests_labelled_by_url_name(self):
+        """Test request counters and histograms per resolved URL name"""
+        self.client.get(reverse('recipes:list'))
+        self.client.get(reverse('recipes:list'))
+        response = self.client.get(reverse('monitoring:metrics'))
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn('recipe_http_requests_total{view="recipes:list",method="GET",status="200"} 2', body)
+        self.assertIn('recipe_http_request_duration_seconds_count{view="recipes:list"} 2', body)
+        self.assertIn('recipe_http_request_duration_seconds_bucket{view="recipes:list",le="+Inf"} 2', body)
+
+    def test_cache_hit_ratio(self):
+        """Test that view cache lookups feed the hit ratio gauge"""
+        self.client.get(reverse('recipes:list'))
+        self.client.get(reverse('recipes:list'))
+        body = self.client.get(reverse('monitoring:metrics')).content.decode()
+        self.assertIn('recipe_view_cache_requests_total{result="hit"} 1', body)
+        self.assertIn('recipe_view_cache_hit_ratio 0.5000', body)
+
+    def test_error_counter(self):
+        """Test that 5xx responses are counted as errors"""
+        metrics.registry.observe_request('recipes:analytics', 'GET', 500, 0.2)
+        body = self.client.get(reverse('monitoring:metrics')).content.decode()
+        self.assertIn('recipe_http_request_errors_total{view="recipes:analytics"} 1', body)
+
+    @override_settings(METRICS_ENABLED=True)
+    async def test_async_stack(self):
+        """Test that requests through an async stack are counted without leaving it"""
+        async def get_response(request):
+            return HttpResponse("ok")
+
+        middleware = MetricsMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+        await middleware(AsyncRequestFactory().get('/'))
+        self.assertEqual(metrics.registry.requests['<unresolved>|GET|200'], 1)
+
+    def test_external_clients_forbidden(self):
+        """Test that the endpoint is only served to internal addresses"""
+        response = self.client.get(reverse('monitoring:metrics'), REMOTE_ADDR='203.0.113.5')
+        self.assertEqual(response.status_code, 403)
+
+    def test_aggregates_worker_files(self):
+        """Test that counters written by other worker processes are merged"""
+        other = {
+            'pid': os.getppid(),
+            'requests': {'recipes:search|GET|200': 3},
+            'errors': {},
+            'durations': {'recipes:search': {'buckets': [3] + [0] * (len(metrics.DURATION_BUCKETS) - 1), 'sum': 0.01, 'count': 3}},
+            'cache': {'hit': 4, 'miss': 0},
+            'db_connections': {'default': 1},
+        }
+        with tempfile.TemporaryDirectory() as metrics_dir:
+            with open(os.path.join(metrics_dir, f'metrics_{os.getppid()}.json'), 'w') as handle:
+                json.dump(other, handle)
+            with override_settings(METRICS_DIR=metrics_dir):
+                self.client.get(reverse('recipes:search'))
+                body = self.client.get(reverse('monitoring:metrics')).content.decode()
+                self.assertTrue(os.path.exists(os.path.join(metrics_dir, f'metrics_{os.getpid()}.json')))
+        self.assertIn('recipe_http_requests_total{view="recipes:search",method="GET",status="200"} 4', body)
+        self.assertIn('recipe_http_request_duration_seconds_count{view="recipes:search"} 4', body)
+
+    def test_adopts_exited_worker_files(self):
+        """Test that an exited worker's counters are kept and its file removed"""
+        exited_pid = int(subprocess.run(
+            [sys.executable, '-c', 'import os; print(os.getpid())'], capture_output=True, text=True, check=True,
+        ).stdout)
+        exited = {
+            'pid': exited_pid,
+            'requests': {'recipes:search|GET|200': 2},
+            'errors': {},
+            'durations': {},
+            'cache': {'hit': 0, 'miss': 0},
+            'db_connections': {'default': 1},
+        }
+        with tempfile.TemporaryDirectory() as metrics_dir:
+            path = os.path.join(metrics_dir, f'metrics_{exited_pid}.json')
+            with open(path, 'w') as handle:
+                json.dump(exited, handle)
+            with override_settings(METRICS_DIR=metrics_dir):
+                first = metrics.merge(metrics.collect())
+                second = metrics.merge(metrics.collect())
+            self.assertFalse(os.path.exists(path))
+        for merged in (first, second):
+            self.assertEqual(merged['requests']['recipes:search|GET|200'], 2)
+            self.assertEqual(merged['db_connections']['default'], metrics.open_connections()['default'])
+
+    def test_counts_connections_of_other_threads(self):
+        """Test that the connection gauge sees connections opened in other threads"""
+        before = metrics.open_connections()['default']
+        opened, release = threading.Event(), threading.Event()
+
+        def worker():
+            connections['default'].ensure_connection()
+            opened.set()
+            release.wait()
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        opened.wait()
+        try:
+            self.assertEqual(metrics.open_connections()['default'], before + 1)
+        finally:
+            release.set()
+            thread.join()
+        # The thread's connection goes away with the thread
+        gc.collect()
+        self.assertEqual(metrics.open_connections()['default'], before)
@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+from . import metrics
+
+# Create your views here.
+
+def metrics_view(request):
+    """Expose request metrics in Prometheus text format (internal only)"""
+    allowed_ips = getattr(settings, 'METRICS_ALLOWED_IPS', ['127.0.0.1', '::1'])
+    if request.META.get('REMOTE_ADDR') not in allowed_ips:
+        return HttpResponseForbidden("Metrics are only available on the internal network.")
+    body = metrics.render_prometheus(metrics.merge(metrics.collect()))
+    return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
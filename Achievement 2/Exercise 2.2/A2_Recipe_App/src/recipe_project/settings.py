@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -43,14 +46,17 @@ INSTALLED_APPS = [
     'recipes',
     'users',
     'ingredients',
+    'monitoring',
 ]
 
 MIDDLEWARE = [
+    'monitoring.middleware.MetricsMiddleware',
+    'monitoring.middleware.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'users.middleware.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -59,7 +65,8 @@ ROOT_URLCONF = 'recipe_project.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates with render timing for PerformanceMiddleware
+        'BACKEND': 'monitoring.template_backend.TimedDjangoTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -73,6 +80,11 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'recipe_project.wsgi.application'
+ASGI_APPLICATION = 'recipe_project.asgi.application'
+
+# Serve the recipe list, detail and search pages with async views. Only enable
+# this when running under an ASGI server such as uvicorn or daphne.
+RECIPE_ASYNC_VIEWS = os.environ.get('DJANGO_ASYNC_VIEWS', '') == '1'
 
 
 # Database
@@ -81,7 +93,8 @@ WSGI_APPLICATION = 'recipe_project.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        # DJANGO_SQLITE_PATH points benchmarks and load tests at a scratch database
+        'NAME': os.environ.get('DJANGO_SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
     }
 }
 
@@ -131,7 +144,83 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+
+# Performance monitoring (see monitoring/middleware.py)
+# Adds Server-Timing headers and logs one JSON line per request at INFO level.
+# Requests over PERF_SLOW_REQUEST_MS milliseconds or PERF_MAX_QUERIES queries are
+# logged at WARNING level as slow. Set DJANGO_PERF_LOG_LEVEL=INFO to log every request.
+
+PERF_MONITORING_ENABLED = os.environ.get('DJANGO_PERF_MONITORING', '1' if DEBUG else '0') == '1'
+PERF_SLOW_REQUEST_MS = int(os.environ.get('DJANGO_PERF_SLOW_REQUEST_MS', 500))
+PERF_MAX_QUERIES = int(os.environ.get('DJANGO_PERF_MAX_QUERIES', 50))
+
+# Prometheus metrics at /internal/metrics/ (see monitoring/metrics.py).
+# With several worker processes set DJANGO_METRICS_DIR to a directory shared by
+# all of them so the endpoint reports every worker, not only the one serving it.
+METRICS_ENABLED = os.environ.get('DJANGO_METRICS', '1') == '1'
+METRICS_DIR = os.environ.get('DJANGO_METRICS_DIR') or None
+METRICS_FLUSH_INTERVAL = float(os.environ.get('DJANGO_METRICS_FLUSH_INTERVAL', 1.0))
+METRICS_ALLOWED_IPS = os.environ.get('DJANGO_METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',')
+
+# Logging
+# https://docs.djangoproject.com/en/5.2/topics/logging/
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'monitoring': {
+            'handlers': ['console'],
+            'level': os.environ.get('DJANGO_PERF_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
+    },
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Select the backend with DJANGO_CACHE_BACKEND: 'locmem' (default), 'file' or 'redis'.
+# DJANGO_CACHE_LOCATION overrides the backend's default location.
+
+CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'recipe-app'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', str(BASE_DIR / 'cache')),
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://127.0.0.1:6379/1'),
+}
+
+CACHE_BACKEND = os.environ.get('DJANGO_CACHE_BACKEND', 'locmem')
+if CACHE_BACKEND not in CACHE_BACKENDS:
+    raise ImproperlyConfigured(
+        f"Unknown DJANGO_CACHE_BACKEND '{CACHE_BACKEND}', expected one of: {', '.join(CACHE_BACKENDS)}"
+    )
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND][0],
+        'LOCATION': os.environ.get('DJANGO_CACHE_LOCATION', CACHE_BACKENDS[CACHE_BACKEND][1]),
+        'TIMEOUT': 300,
+    }
+}
+
+# Seconds a rendered recipe page stays cached (0 disables view caching)
+RECIPE_VIEW_CACHE_TIMEOUT = int(os.environ.get('DJANGO_VIEW_CACHE_TIMEOUT', 60))
+
 # Authentication settings
 LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/list/'
 LOGOUT_REDIRECT_URL = '/'
+
+# Sessions are read from the cache and only written through to the database,
+# and the authenticated user is cached per session (see users/middleware.py)
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+AUTH_USER_CACHE_TIMEOUT = int(os.environ.get('DJANGO_AUTH_USER_CACHE_TIMEOUT', 300))
+# The user cache needs a cache shared by every worker ('file' or 'redis') so a
+# password change or logout reaches all of them; with 'locmem' it is off unless
+# DJANGO_AUTH_USER_CACHE_PROCESS_LOCAL=1 says a single process serves requests.
+AUTH_USER_CACHE_PROCESS_LOCAL = os.environ.get('DJANGO_AUTH_USER_CACHE_PROCESS_LOCAL', '0') == '1'
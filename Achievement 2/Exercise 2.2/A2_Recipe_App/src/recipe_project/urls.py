@@ -21,6 +21,7 @@ from django.conf.urls.static import static
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('internal/', include('monitoring.urls')),
     path('', include('recipes.urls')),
 ]
 
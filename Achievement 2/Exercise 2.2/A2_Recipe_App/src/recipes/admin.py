@@ -1,12 +1,30 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.contrib.admin.views.main import ChangeList
+from django.db.models import Prefetch
+from .autocomplete import PrefixAutocompleteMixin
+from .cache import bump_generation
 from .models import Recipe, Category
+from .paginator import EstimatedCountPaginator
 from ingredients.models import RecipeIngredient
 
 # Register your models here.
 
+class RecipeChangeList(ChangeList):
+    """Changelist that fetches each row's first three ingredients in one query"""
+
+    def get_queryset(self, request, exclude_parameters=None):
+        queryset = super().get_queryset(request, exclude_parameters)
+        return queryset.prefetch_related(Prefetch(
+            'recipeingredient_set',
+            queryset=RecipeIngredient.objects.select_related('ingredient').order_by('pk')[:3],
+            to_attr='first_ingredients',
+        ))
+
 class RecipeIngredientInline(admin.TabularInline):
     model = RecipeIngredient
     extra = 3  # Show 3 empty ingredient forms by default
+    # Search ingredients as you type instead of rendering every one per row
+    autocomplete_fields = ('ingredient',)
     verbose_name = "Ingredient"
     verbose_name_plural = "Ingredients"
 
@@ -17,12 +35,17 @@ class CategoryAdmin(admin.ModelAdmin):
     fields = ('name', 'description', 'image')
 
 @admin.register(Recipe)
-class RecipeAdmin(admin.ModelAdmin):
+class RecipeAdmin(PrefixAutocompleteMixin, admin.ModelAdmin):
     list_display = ('name', 'category', 'difficulty', 'cooking_time', 'servings', 'user', 'created_date', 'get_ingredients_display')
     list_filter = ('difficulty', 'category', 'created_date')
+    list_select_related = ('category', 'user')
     search_fields = ('name', 'description')
+    # Avoid exact COUNT(*) over the whole table on every changelist load
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     readonly_fields = ('created_date', 'updated_date', 'difficulty')
     inlines = [RecipeIngredientInline]
+    actions = ['recompute_difficulty_selected', 'recompute_difficulty_all']
     
     fieldsets = (
         ('Basic Information', {
@@ -37,10 +60,30 @@ class RecipeAdmin(admin.ModelAdmin):
         }),
     )
     
+    def get_changelist(self, request, **kwargs):
+        return RecipeChangeList
+    
     def get_ingredients_display(self, obj):
         """Display ingredients in the list view"""
-        ingredients = obj.get_ingredients_list()
+        first_ingredients = getattr(obj, 'first_ingredients', None)
+        if first_ingredients is None:
+            first_ingredients = obj.recipeingredient_set.select_related('ingredient').order_by('pk')[:3]
+        ingredients = [Recipe.format_ingredient(ri) for ri in first_ingredients]
         if ingredients:
-            return "; ".join(ingredients[:3])  # Show first 3 ingredients
+            return "; ".join(ingredients)  # Show first 3 ingredients
         return "No ingredients"
     get_ingredients_display.short_description = "Ingredients" # type: ignore
+    
+    def _recompute_difficulty(self, request, queryset):
+        updated = queryset.recompute_difficulty()
+        # QuerySet.update() sends no signals, so invalidate cached recipe pages explicitly
+        bump_generation()
+        self.message_user(request, f"Recomputed difficulty for {updated} recipes.", messages.SUCCESS)
+    
+    @admin.action(description="Recompute difficulty for selected recipes", permissions=['change'])
+    def recompute_difficulty_selected(self, request, queryset):
+        self._recompute_difficulty(request, queryset)
+    
+    @admin.action(description="Recompute difficulty for all recipes (ignores selection)", permissions=['change'])
+    def recompute_difficulty_all(self, request, queryset):
+        self._recompute_difficulty(request, Recipe.objects.all())
@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_save, post_delete
 
 
 class RecipesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'recipes'
+
+    def ready(self):
+        # Invalidate cached recipe pages whenever recipe data changes
+        from .cache import bump_generation
+        from ingredients.models import Ingredient, RecipeIngredient
+
+        for model in (self.get_model('Recipe'), self.get_model('Category'), Ingredient, RecipeIngredient):
+            post_save.connect(bump_generation, sender=model, dispatch_uid=f'recipes_cache_save_{model.__name__}')
+            post_delete.connect(bump_generation, sender=model, dispatch_uid=f'recipes_cache_delete_{model.__name__}')
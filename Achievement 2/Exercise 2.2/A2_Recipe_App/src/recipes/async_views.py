@@ -0,0 +1,117 @@
+"""
+Async variants of the recipe list, detail and search views.
+
+These are used instead of the views in ``recipes/views.py`` when the app is
+served over ASGI with ``RECIPE_ASYNC_VIEWS`` enabled (see ``recipes/urls.py``).
+Database access goes through Django's async ORM and ``request.auser()``, so a
+request waiting on the database does not hold a worker thread. Rendering
+templates and building the pandas DataFrame for search results are CPU-bound
+and run in worker threads, so they never block the event loop.
+"""
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import render, aget_object_or_404
+
+from . import heavy
+from .cache import cache_recipe_view
+from .models import Recipe
+
+
+def _recipes_with_ingredients():
+    return Recipe.objects.all().select_related('category', 'user').prefetch_related('recipeingredient_set__ingredient')
+
+
+def _matches_cooking_time(cooking_time, choice):
+    if choice == 'quick':
+        return cooking_time < 30
+    elif choice == 'medium':
+        return 30 <= cooking_time <= 60
+    elif choice == 'long':
+        return cooking_time > 60
+    return True
+
+
+def _build_search_dataframe(recipes, difficulty='', cooking_time=''):
+    """Filter recipes in memory and build the search results DataFrame"""
+    pd = heavy.pandas()
+    df_data = []
+    for recipe in recipes:
+        recipe_difficulty = recipe.calculate_difficulty()
+        if difficulty and difficulty != 'any' and recipe_difficulty.lower() != difficulty.lower():
+            continue
+        if cooking_time and cooking_time != 'any' and not _matches_cooking_time(recipe.cooking_time, cooking_time):
+            continue
+        ingredients = recipe.get_ingredients_list()
+        df_data.append({
+            'id': recipe.pk,
+            'name': recipe.name,
+            'cooking_time': recipe.cooking_time,
+            'difficulty': recipe_difficulty,
+            'ingredients': ', '.join(ingredients[:3]) + ('...' if len(ingredients) > 3 else '')
+        })
+    return pd.DataFrame(df_data)
+
+
+@login_required
+@cache_recipe_view()
+async def recipe_list(request):
+    """Display all recipes with their ingredients - Protected view"""
+    recipes = [recipe async for recipe in _recipes_with_ingredients()]
+    return await sync_to_async(render, thread_sensitive=False)(request, 'recipes/list.html', {'recipes': recipes})
+
+
+@login_required
+@cache_recipe_view()
+async def recipe_detail(request, pk):
+    """Display detailed view of a single recipe - Protected view"""
+    recipe = await aget_object_or_404(_recipes_with_ingredients(), pk=pk)
+
+    context = {
+        'recipe': recipe,
+        'calculated_difficulty': recipe.calculate_difficulty(),
+        'ingredients_list': recipe.get_ingredients_list(),
+    }
+    return await sync_to_async(render, thread_sensitive=False)(request, 'recipes/detail.html', context)
+
+
+@login_required
+@cache_recipe_view(vary_on_user=True)
+async def search_recipes(request):
+    """Search recipes with multiple criteria"""
+    pd = await sync_to_async(heavy.pandas, thread_sensitive=False)()
+    recipes_df = pd.DataFrame()
+    search_performed = False
+
+    if request.method == 'POST' or request.GET.get('show_all'):
+        search_performed = True
+        recipes = _recipes_with_ingredients()
+        difficulty = cooking_time = ''
+
+        if request.method == 'POST':
+            recipe_name = request.POST.get('recipe_name', '').strip()
+            ingredients = request.POST.get('ingredients', '').strip()
+            difficulty = request.POST.get('difficulty', '')
+            cooking_time = request.POST.get('cooking_time', '')
+
+            if recipe_name:
+                recipes = recipes.filter(name__icontains=recipe_name)
+
+            if ingredients:
+                # Search in ingredient names (wildcard search)
+                recipes = recipes.filter(
+                    ingredients__name__icontains=ingredients
+                ).distinct()
+
+        recipe_list = [recipe async for recipe in recipes]
+        recipes_df = await sync_to_async(_build_search_dataframe, thread_sensitive=False)(
+            recipe_list, difficulty, cooking_time
+        )
+
+    context = {
+        'recipes_df': recipes_df,
+        'search_performed': search_performed,
+        'recipes_count': len(recipes_df) if not recipes_df.empty else 0
+    }
+
+    return await sync_to_async(render, thread_sensitive=False)(request, 'recipes/search.html', context)
@@ -0,0 +1,137 @@
+"""
+View caching helpers for the Recipe App.
+
+Responses are stored in the configured ``CACHES['default']`` backend (see
+``recipe_project/settings.py``). Every key embeds a generation number that is
+bumped whenever recipe data changes, so stale pages are never served after an
+edit in the admin.
+"""
+
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from monitoring.metrics import record_cache_access
+
+GENERATION_KEY = 'recipes:views:generation'
+CACHE_KEY_PREFIX = 'recipes:views'
+
+
+def get_generation():
+    """Return the current cache generation, initialising it if needed"""
+    return cache.get_or_set(GENERATION_KEY, 1, None)
+
+
+def bump_generation(**kwargs):
+    """Invalidate every cached recipe page by moving to a new generation"""
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        # Key was evicted or never set - start a fresh generation
+        cache.set(GENERATION_KEY, 2, None)
+
+
+async def aget_generation():
+    return await cache.aget_or_set(GENERATION_KEY, 1, None)
+
+
+def _request_digest(request, user_id, vary_on_user):
+    parts = [request.method, request.get_full_path()]
+    if vary_on_user:
+        parts.append(str(user_id))
+        parts.append(request.META.get('CSRF_COOKIE', ''))
+    return hashlib.md5('|'.join(parts).encode('utf-8')).hexdigest()
+
+
+def build_cache_key(request, vary_on_user=False):
+    """Build the cache key for a request.
+
+    Shared entries are keyed on the full path only. User-specific entries also
+    include the user id and the CSRF secret, because pages with forms embed a
+    CSRF token derived from it.
+    """
+    user_id = request.user.pk if vary_on_user else None
+    digest = _request_digest(request, user_id, vary_on_user)
+    return f"{CACHE_KEY_PREFIX}:{get_generation()}:{digest}"
+
+
+async def abuild_cache_key(request, vary_on_user=False):
+    user_id = (await request.auser()).pk if vary_on_user else None
+    digest = _request_digest(request, user_id, vary_on_user)
+    return f"{CACHE_KEY_PREFIX}:{await aget_generation()}:{digest}"
+
+
+def _view_timeout(timeout):
+    if timeout is None:
+        return getattr(settings, 'RECIPE_VIEW_CACHE_TIMEOUT', 60)
+    return timeout
+
+
+def _is_cacheable_request(request, timeout, vary_on_user):
+    if request.method not in ('GET', 'HEAD') or not timeout:
+        return False
+    # A user without a CSRF cookie gets a freshly generated token,
+    # which must not be stored under (or served from) a shared key
+    if vary_on_user and 'CSRF_COOKIE' not in request.META:
+        return False
+    return True
+
+
+def _is_cacheable_response(response):
+    return response.status_code == 200 and not response.streaming
+
+
+def cache_recipe_view(timeout=None, vary_on_user=False):
+    """Cache the rendered response of a login-required view.
+
+    Apply it below ``@login_required`` so anonymous users are redirected before
+    the cache is consulted. Only successful GET/HEAD responses are stored.
+    Set ``vary_on_user`` for views whose output depends on the current user
+    (e.g. pages containing a CSRF-protected form); all other views share one
+    entry across users. Works for both sync and async views.
+    """
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def _wrapped_view(request, *args, **kwargs):
+                view_timeout = _view_timeout(timeout)
+                if not _is_cacheable_request(request, view_timeout, vary_on_user):
+                    return await view_func(request, *args, **kwargs)
+
+                cache_key = await abuild_cache_key(request, vary_on_user=vary_on_user)
+                response = await cache.aget(cache_key)
+                record_cache_access(response is not None)
+                if response is not None:
+                    return response
+
+                response = await view_func(request, *args, **kwargs)
+                if _is_cacheable_response(response):
+                    await cache.aset(cache_key, response, view_timeout)
+                return response
+            return _wrapped_view
+
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            view_timeout = _view_timeout(timeout)
+            if not _is_cacheable_request(request, view_timeout, vary_on_user):
+                return view_func(request, *args, **kwargs)
+
+            cache_key = build_cache_key(request, vary_on_user=vary_on_user)
+            response = cache.get(cache_key)
+            record_cache_access(response is not None)
+            if response is not None:
+                return response
+
+            response = view_func(request, *args, **kwargs)
+            if _is_cacheable_response(response):
+                if hasattr(response, 'render') and callable(response.render):
+                    response.add_post_render_callback(
+                        lambda r: cache.set(cache_key, r, view_timeout)
+                    )
+                else:
+                    cache.set(cache_key, response, view_timeout)
+            return response
+        return _wrapped_view
+    return decorator
@@ -0,0 +1,26 @@
+"""
+Lazy accessors for heavy optional dependencies.
+
+pandas and matplotlib together add hundreds of milliseconds and tens of
+megabytes to process startup. Views call these accessors instead of importing
+the libraries at module level, so ``manage.py migrate``, test runs and workers
+that never render a search or analytics page don't pay for them.
+"""
+
+import sys
+
+
+def pandas():
+    """Return the pandas module, importing it on first use"""
+    import pandas
+    return pandas
+
+
+def pyplot():
+    """Return matplotlib.pyplot configured with the non-GUI Agg backend"""
+    import matplotlib
+    if 'matplotlib.pyplot' not in sys.modules:
+        # Switching backends after pyplot is loaded would close open figures
+        matplotlib.use('Agg')  # Use non-GUI backend
+    import matplotlib.pyplot as plt
+    return plt
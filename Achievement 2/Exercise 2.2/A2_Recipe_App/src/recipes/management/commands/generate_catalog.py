@@ -0,0 +1,186 @@
+import itertools
+import math
+import random
+import time
+from bisect import bisect_left
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+
+from ingredients.models import Ingredient, RecipeIngredient
+from recipes.cache import bump_generation
+from recipes.models import Category, Recipe
+
+BASE_INGREDIENTS = [
+    'Garlic', 'Onion', 'Olive Oil', 'Salt', 'Black Pepper', 'Butter', 'Eggs', 'Flour', 'Sugar', 'Milk',
+    'Tomato', 'Chicken', 'Beef', 'Pork', 'Rice', 'Pasta', 'Potato', 'Carrot', 'Celery', 'Lemon',
+    'Parsley', 'Basil', 'Thyme', 'Rosemary', 'Oregano', 'Cumin', 'Paprika', 'Ginger', 'Soy Sauce', 'Honey',
+    'Cheddar', 'Parmesan', 'Mozzarella', 'Cream', 'Yogurt', 'Spinach', 'Mushroom', 'Bell Pepper', 'Chili', 'Lime',
+    'Cilantro', 'Coconut Milk', 'Chickpeas', 'Lentils', 'Salmon', 'Shrimp', 'Tofu', 'Bacon', 'Zucchini', 'Eggplant',
+    'Cinnamon', 'Vanilla', 'Cocoa', 'Almonds', 'Walnuts', 'Oats', 'Apple', 'Banana', 'Strawberry', 'Avocado',
+]
+INGREDIENT_VARIANTS = ['', 'Fresh', 'Dried', 'Smoked', 'Roasted', 'Organic', 'Ground', 'Chopped', 'Wild', 'Baby']
+UNITS = ['grams', 'ml', 'pieces', 'tbsp', 'tsp', 'cups']
+
+NAME_ADJECTIVES = [
+    'Classic', 'Spicy', 'Creamy', 'Smoky', 'Crispy', 'Rustic', 'Quick', 'Hearty', 'Zesty', 'Golden',
+    'Herbed', 'Slow-Cooked', 'Grilled', 'Baked', 'Honey-Glazed', "Grandma's", 'Easy', 'Sunday',
+]
+DISH_TYPES = [
+    'Stew', 'Salad', 'Soup', 'Curry', 'Pasta', 'Tart', 'Bake', 'Stir-Fry', 'Risotto', 'Tacos',
+    'Skillet', 'Casserole', 'Bowl', 'Pie', 'Roast', 'Sandwich', 'Omelette', 'Pancakes',
+]
+CATEGORY_NAMES = [
+    'Dinner', 'Lunch', 'Breakfast', 'Dessert', 'Italian', 'Mexican', 'Indian', 'Chinese', 'Vegetarian',
+    'Vegan', 'Seafood', 'Baking', 'Soups', 'Salads', 'Snacks', 'Drinks', 'Thai', 'French', 'Greek', 'Japanese',
+]
+
+
+def zipf_cum_weights(count, exponent):
+    """Cumulative weights for a Zipf distribution over ``count`` ranks"""
+    return list(itertools.accumulate(1.0 / (rank ** exponent) for rank in range(1, count + 1)))
+
+
+def sample_index(rng, cum_weights):
+    return bisect_left(cum_weights, rng.random() * cum_weights[-1])
+
+
+def ingredient_names(count):
+    """Plausible, unique ingredient names: base names, then variants, then numbered"""
+    names = []
+    for variant in INGREDIENT_VARIANTS:
+        for base in BASE_INGREDIENTS:
+            names.append(f"{variant} {base}".strip())
+            if len(names) == count:
+                return names
+    for number in itertools.count(2):
+        for base in BASE_INGREDIENTS:
+            names.append(f"{base} No. {number}")
+            if len(names) == count:
+                return names
+    return names
+
+
+class Command(BaseCommand):
+    help = "Generate a synthetic recipe catalog with Zipf-distributed ingredients for load testing"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipes', type=int, required=True, help="Number of recipes to add")
+        parser.add_argument('--ingredients', type=int, default=1000, help="Size of the ingredient vocabulary (default: 1000)")
+        parser.add_argument('--users', type=int, default=200, help="Number of recipe authors (default: 200)")
+        parser.add_argument('--categories', type=int, default=60, help="Number of categories (default: 60)")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed for reproducible catalogs (default: 0)")
+        parser.add_argument('--zipf', type=float, default=1.1, help="Zipf exponent for popularity skew (default: 1.1)")
+        parser.add_argument('--batch-size', type=int, default=5000, help="Recipes per bulk insert (default: 5000)")
+
+    def handle(self, *args, **options):
+        if options['recipes'] < 1 or options['ingredients'] < 15:
+            raise CommandError("--recipes must be positive and --ingredients at least 15")
+
+        rng = random.Random(options['seed'])
+        started = time.perf_counter()
+
+        users = self.ensure_users(options['users'])
+        categories = self.ensure_categories(options['categories'])
+        # Separate stream so reusing an existing vocabulary yields the same recipes
+        ingredient_ids = self.ensure_ingredients(options['ingredients'], random.Random(options['seed']))
+
+        # Popularity ranks: a few very common ingredients, categories and authors
+        ingredient_weights = zipf_cum_weights(len(ingredient_ids), options['zipf'])
+        category_weights = zipf_cum_weights(len(categories), options['zipf'])
+        user_weights = zipf_cum_weights(len(users), options['zipf'])
+
+        total = options['recipes']
+        batch_size = options['batch_size']
+        # Let the database number the recipes where bulk_create returns the new
+        # ids; elsewhere number them here and move the sequence past them at the end
+        returns_ids = connection.features.can_return_rows_from_bulk_insert
+        next_id = None if returns_ids else (Recipe.objects.aggregate(Max('id'))['id__max'] or 0) + 1
+        links = 0
+
+        for batch_start in range(0, total, batch_size):
+            recipes, recipe_links = [], []
+            for _ in range(batch_start, min(batch_start + batch_size, total)):
+                # 1-15 ingredients, most recipes around 5-8
+                ingredient_count = max(1, min(15, int(rng.gauss(6.5, 2.5))))
+                chosen = set()
+                while len(chosen) < ingredient_count:
+                    chosen.add(ingredient_ids[sample_index(rng, ingredient_weights)])
+
+                # Log-normal cooking times: mostly 15-60 minutes with a long tail
+                cooking_time = max(1, min(480, int(math.exp(rng.gauss(3.4, 0.7)))))
+                main_ingredient = self.ingredient_lookup[min(chosen)]
+                recipe = Recipe(
+                    name=f"{rng.choice(NAME_ADJECTIVES)} {main_ingredient} {rng.choice(DISH_TYPES)}",
+                    cooking_time=cooking_time,
+                    servings=rng.choice((1, 2, 2, 4, 4, 4, 6, 8)),
+                    difficulty=Recipe.difficulty_for(cooking_time, ingredient_count),
+                    user_id=users[sample_index(rng, user_weights)],
+                    category_id=None if rng.random() < 0.05 else categories[sample_index(rng, category_weights)],
+                )
+                if next_id is not None:
+                    recipe.id = next_id
+                    next_id += 1
+                recipes.append(recipe)
+                for ingredient_id in chosen:
+                    # recipe_id is filled in from recipe.pk once the recipe is saved
+                    recipe_links.append(RecipeIngredient(
+                        recipe=recipe,
+                        ingredient_id=ingredient_id,
+                        quantity=None if rng.random() < 0.2 else round(rng.uniform(0.5, 500), 1),
+                    ))
+
+            with transaction.atomic():
+                Recipe.objects.bulk_create(recipes)
+                RecipeIngredient.objects.bulk_create(recipe_links)
+            links += len(recipe_links)
+
+            done = min(batch_start + batch_size, total)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"  {done}/{total} recipes, {links} ingredient links ({done / elapsed:,.0f} recipes/s)")
+
+        if not returns_ids:
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sequence_reset_sql(no_style(), [Recipe]):
+                    cursor.execute(sql)
+
+        # bulk_create sends no signals, so invalidate cached recipe pages explicitly
+        bump_generation()
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {total} recipes and {links} ingredient links in {time.perf_counter() - started:.1f}s"
+        ))
+
+    def ensure_users(self, count):
+        existing = set(User.objects.filter(username__startswith='catalog_user_').values_list('username', flat=True))
+        # Unusable passwords: these accounts only own recipes
+        User.objects.bulk_create(
+            User(username=f'catalog_user_{i}', password='!')
+            for i in range(count) if f'catalog_user_{i}' not in existing
+        )
+        return list(User.objects.filter(username__startswith='catalog_user_').order_by('id').values_list('id', flat=True))
+
+    def ensure_categories(self, count):
+        names = [
+            CATEGORY_NAMES[i] if i < len(CATEGORY_NAMES) else f"{CATEGORY_NAMES[i % len(CATEGORY_NAMES)]} {i // len(CATEGORY_NAMES) + 1}"
+            for i in range(count)
+        ]
+        existing = set(Category.objects.values_list('name', flat=True))
+        Category.objects.bulk_create(Category(name=name) for name in names if name not in existing)
+        by_name = dict(Category.objects.values_list('name', 'id'))
+        return [by_name[name] for name in names]
+
+    def ensure_ingredients(self, count, rng):
+        names = ingredient_names(count)
+        existing = set(Ingredient.objects.values_list('name', flat=True))
+        Ingredient.objects.bulk_create(
+            (Ingredient(name=name, unit_of_measure=rng.choice(UNITS)) for name in names if name not in existing),
+            batch_size=5000,
+        )
+        by_name = dict(Ingredient.objects.values_list('name', 'id'))
+        # Rank order follows the name list, so base ingredients are the most popular
+        ids = [by_name[name] for name in names]
+        self.ingredient_lookup = {by_name[name]: name for name in names}
+        return ids
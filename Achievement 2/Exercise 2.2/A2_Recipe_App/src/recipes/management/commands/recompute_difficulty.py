@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes.cache import bump_generation
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = "Recompute every recipe's difficulty with set-based UPDATE ... CASE statements"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=10000, help="Ids per UPDATE (default: 10000)")
+        parser.add_argument('--ids', help="Comma-separated recipe ids to limit the recompute to")
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError("--chunk-size must be positive")
+
+        recipes = Recipe.objects.all()
+        if options['ids']:
+            try:
+                recipes = recipes.filter(pk__in=[int(pk) for pk in options['ids'].split(',')])
+            except ValueError:
+                raise CommandError("--ids must be a comma-separated list of integers")
+
+        started = time.perf_counter()
+
+        def progress(done, total):
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"  {done}/{total} ids ({done / max(elapsed, 1e-9):,.0f} ids/s)")
+
+        updated = recipes.recompute_difficulty(chunk_size=options['chunk_size'], progress=progress)
+        # QuerySet.update() sends no signals, so invalidate cached recipe pages explicitly
+        bump_generation()
+        self.stdout.write(self.style.SUCCESS(
+            f"Recomputed difficulty for {updated} recipes in {time.perf_counter() - started:.1f}s"
+        ))
@@ -0,0 +1,81 @@
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Script run in a fresh interpreter so nothing is already imported
+PROFILE_SCRIPT = """
+import django
+django.setup()
+import importlib
+for name in {modules!r}:
+    importlib.import_module(name)
+"""
+
+
+def parse_importtime(output):
+    """Parse ``-X importtime`` output into (module, self_us, cumulative_us) rows"""
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        try:
+            self_us, cumulative_us, module = line[len('import time:'):].split('|')
+            rows.append((module.strip(), int(self_us), int(cumulative_us)))
+        except ValueError:
+            continue
+    return rows
+
+
+class Command(BaseCommand):
+    help = "Report an import-time breakdown for starting the project (python -X importtime)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'modules', nargs='*',
+            help="Modules to import after django.setup() (default: the ROOT_URLCONF)",
+        )
+        parser.add_argument(
+            '--top', type=int, default=20,
+            help="Number of slowest modules and packages to list (default: 20)",
+        )
+
+    def handle(self, *args, **options):
+        modules = options['modules'] or [settings.ROOT_URLCONF]
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'recipe_project.settings'))
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', PROFILE_SCRIPT.format(modules=modules)],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            raise CommandError(f"Profiling import failed:\n{result.stderr[-2000:]}")
+
+        rows = parse_importtime(result.stderr)
+        if not rows:
+            raise CommandError("No -X importtime output was captured")
+
+        total_us = sum(self_us for _, self_us, _ in rows)
+        by_package = defaultdict(int)
+        for module, self_us, _ in rows:
+            by_package[module.split('.')[0]] += self_us
+
+        top = options['top']
+        self.stdout.write(f"Imported {len(rows)} modules in {total_us / 1000:.1f} ms ({', '.join(modules)})")
+
+        self.stdout.write(self.style.MIGRATE_HEADING("\nTime by top-level package (self time):"))
+        for package, self_us in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]:
+            share = 100 * self_us / total_us
+            self.stdout.write(f"  {self_us / 1000:9.1f} ms  {share:5.1f}%  {package}")
+
+        self.stdout.write(self.style.MIGRATE_HEADING("\nSlowest modules (cumulative time):"))
+        for module, self_us, cumulative_us in sorted(rows, key=lambda row: row[2], reverse=True)[:top]:
+            self.stdout.write(f"  {cumulative_us / 1000:9.1f} ms  (self {self_us / 1000:7.1f} ms)  {module}")
+
+        heavy_loaded = [name for name in ('pandas', 'matplotlib') if name in by_package]
+        if heavy_loaded:
+            self.stdout.write(self.style.WARNING(
+                f"\nHeavy dependencies imported at startup: {', '.join(heavy_loaded)}"
+            ))
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ingredients', '0002_alter_recipeingredient_quantity'),
+        ('recipes', '0003_category_image_recipe_description_recipe_image_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['created_date'], name='recipe_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['category', 'created_date'], name='recipe_category_created_idx'),
+        ),
+    ]
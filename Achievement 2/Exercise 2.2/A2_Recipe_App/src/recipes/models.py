@@ -1,4 +1,7 @@
 from django.db import models
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import LessThan, LessThanOrEqual
 from django.contrib.auth.models import User
 
 # Create your models here.
@@ -14,6 +17,34 @@ class Category(models.Model):
     class Meta:
         verbose_name_plural = "Categories"
 
+class RecipeQuerySet(models.QuerySet):
+    def recompute_difficulty(self, chunk_size=10000, progress=None):
+        """Recompute difficulty with one UPDATE ... CASE per id-range chunk
+        
+        Sends no signals and leaves updated_date alone; callers should bump
+        the view cache generation. ``progress(done, total)`` is called after
+        each chunk. Returns the number of rows updated.
+        """
+        through = self.model._meta.get_field('ingredients').remote_field.through
+        ingredient_count = Coalesce(Subquery(
+            through.objects.filter(recipe=OuterRef('pk'))
+            .order_by().values('recipe').annotate(count=Count('pk')).values('count'),
+            output_field=IntegerField(),
+        ), 0)
+        difficulty = self.model.difficulty_expression(F('cooking_time'), ingredient_count)
+        
+        bounds = self.order_by().aggregate(low=models.Min('pk'), high=models.Max('pk'))
+        if bounds['low'] is None:
+            return 0
+        total = bounds['high'] - bounds['low'] + 1
+        updated = 0
+        for start in range(bounds['low'], bounds['high'] + 1, chunk_size):
+            chunk = self.filter(pk__gte=start, pk__lt=start + chunk_size)
+            updated += chunk.update(difficulty=difficulty)
+            if progress:
+                progress(min(start + chunk_size - bounds['low'], total), total)
+        return updated
+
 class Recipe(models.Model):
     DIFFICULTY_CHOICES = [
         ('Easy', 'Easy'),
@@ -34,32 +65,59 @@ class Recipe(models.Model):
     category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True)
     ingredients = models.ManyToManyField('ingredients.Ingredient', through='ingredients.RecipeIngredient', blank=True)
     
+    objects = RecipeQuerySet.as_manager()
+    
     def __str__(self):
         return self.name
     
     def get_ingredients_list(self):
         """Return a formatted list of ingredients with optional quantities"""
         recipe_ingredients = self.recipeingredient_set.all() # type: ignore
-        result = []
-        for ri in recipe_ingredients:
-            if ri.quantity:
-                result.append(f"{ri.quantity} {ri.ingredient.unit_of_measure} of {ri.ingredient.name}")
-            else:
-                result.append(f"{ri.ingredient.name}")
-        return result
+        return [self.format_ingredient(ri) for ri in recipe_ingredients]
     
-    def calculate_difficulty(self):
-        """Calculate recipe difficulty based on cooking time and number of ingredients"""
-        ingredient_count = self.ingredients.count()
-        
+    @staticmethod
+    def format_ingredient(ri):
+        """Format one RecipeIngredient as shown in ingredient lists"""
+        if ri.quantity:
+            return f"{ri.quantity} {ri.ingredient.unit_of_measure} of {ri.ingredient.name}"
+        return f"{ri.ingredient.name}"
+    
+    @staticmethod
+    def difficulty_for(cooking_time, ingredient_count):
+        """Return the difficulty for a cooking time and number of ingredients"""
         # Base difficulty on cooking time and ingredient complexity
-        if self.cooking_time < 30 and ingredient_count <= 5:
+        if cooking_time < 30 and ingredient_count <= 5:
             return 'Easy'
-        elif self.cooking_time <= 60 and ingredient_count <= 10:
+        elif cooking_time <= 60 and ingredient_count <= 10:
             return 'Medium'
         else:
             return 'Hard'
     
+    @staticmethod
+    def difficulty_expression(cooking_time, ingredient_count):
+        """SQL version of difficulty_for, for set-based updates"""
+        return Case(
+            When(Q(LessThan(cooking_time, 30)) & Q(LessThanOrEqual(ingredient_count, 5)), then=Value('Easy')),
+            When(Q(LessThanOrEqual(cooking_time, 60)) & Q(LessThanOrEqual(ingredient_count, 10)), then=Value('Medium')),
+            default=Value('Hard'),
+            output_field=models.CharField(),
+        )
+    
+    def get_ingredient_count(self):
+        """Return the number of ingredients, reusing annotated or prefetched data when present"""
+        if hasattr(self, 'num_ingredients'):
+            return self.num_ingredients
+        prefetched = getattr(self, '_prefetched_objects_cache', {})
+        if 'recipeingredient_set' in prefetched:
+            return len(prefetched['recipeingredient_set'])
+        if 'ingredients' in prefetched:
+            return len(prefetched['ingredients'])
+        return self.ingredients.count()
+    
+    def calculate_difficulty(self):
+        """Calculate recipe difficulty based on cooking time and number of ingredients"""
+        return self.difficulty_for(self.cooking_time, self.get_ingredient_count())
+    
     def save(self, *args, **kwargs):
         # Auto-calculate difficulty if not manually set
         if not self.difficulty:
@@ -72,3 +130,11 @@ class Recipe(models.Model):
     
     class Meta:
         ordering = ['-created_date']
+        indexes = [
+            # Prefix lookups from admin autocomplete widgets
+            models.Index(fields=['name'], name='recipe_name_idx'),
+            # Default ordering and the admin's created_date filter
+            models.Index(fields=['created_date'], name='recipe_created_idx'),
+            # Admin changelist filtered by category, newest first
+            models.Index(fields=['category', 'created_date'], name='recipe_category_created_idx'),
+        ]
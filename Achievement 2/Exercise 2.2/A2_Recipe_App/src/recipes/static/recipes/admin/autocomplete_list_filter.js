@@ -0,0 +1,18 @@
+'use strict';
+{
+    const $ = django.jQuery;
+
+    // Reload the changelist filtered by the object picked in an autocomplete filter
+    $(function() {
+        $('.autocomplete-list-filter select').on('change', function() {
+            const url = new URL(window.location.href);
+            url.searchParams.delete('p');
+            if (this.value) {
+                url.searchParams.set(this.name, this.value);
+            } else {
+                url.searchParams.delete(this.name);
+            }
+            window.location.href = url.toString();
+        });
+    });
+}
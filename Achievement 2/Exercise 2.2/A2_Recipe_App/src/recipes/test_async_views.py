@@ -0,0 +1,97 @@
+"""
+Tests for the async recipe views (recipes/async_views.py)
+"""
+
+import threading
+from unittest import mock
+
+from django.test import TestCase, AsyncRequestFactory
+from django.contrib.auth.models import User, AnonymousUser
+from django.core.cache import cache
+from django.http import Http404
+from django.shortcuts import render
+
+from . import async_views
+from .models import Category, Recipe
+from ingredients.models import Ingredient, RecipeIngredient
+
+
+class AsyncRecipeViewsTest(TestCase):
+    """Test the async list, detail and search views"""
+
+    def setUp(self):
+        """Set up recipes with ingredients"""
+        cache.clear()
+        self.factory = AsyncRequestFactory()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.category = Category.objects.create(name="Breakfast")
+        self.omelette = Recipe.objects.create(
+            name="Omelette", cooking_time=10, user=self.user, category=self.category
+        )
+        self.stew = Recipe.objects.create(name="Beef Stew", cooking_time=120, user=self.user)
+        eggs = Ingredient.objects.create(name="Eggs", unit_of_measure="pieces")
+        beef = Ingredient.objects.create(name="Beef", unit_of_measure="grams")
+        RecipeIngredient.objects.create(recipe=self.omelette, ingredient=eggs, quantity=3)
+        RecipeIngredient.objects.create(recipe=self.stew, ingredient=beef, quantity=500)
+
+    def _request(self, path, method='get', data=None, user=None):
+        request = getattr(self.factory, method)(path, data or {})
+        request.user = user or self.user
+
+        async def auser():
+            return request.user
+        request.auser = auser
+        return request
+
+    async def test_recipe_list(self):
+        """Test that the async list view renders every recipe"""
+        response = await async_views.recipe_list(self._request('/list/'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Omelette")
+        self.assertContains(response, "Beef Stew")
+
+    async def test_recipe_detail(self):
+        """Test that the async detail view calculates difficulty"""
+        response = await async_views.recipe_detail(self._request('/recipe/'), pk=self.stew.pk)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Beef Stew")
+        self.assertContains(response, "Hard")
+
+    async def test_templates_render_off_the_event_loop(self):
+        """Test that list and detail pages are rendered in a worker thread"""
+        loop_thread = threading.get_ident()
+        threads = []
+
+        def recording_render(*args, **kwargs):
+            threads.append(threading.get_ident())
+            return render(*args, **kwargs)
+
+        with mock.patch.object(async_views, 'render', recording_render):
+            await async_views.recipe_list(self._request('/list/'))
+            await async_views.recipe_detail(self._request('/recipe/'), pk=self.stew.pk)
+        self.assertEqual(len(threads), 2)
+        self.assertNotIn(loop_thread, threads)
+
+    async def test_recipe_detail_404(self):
+        """Test that a missing recipe raises 404"""
+        with self.assertRaises(Http404):
+            await async_views.recipe_detail(self._request('/recipe/'), pk=999)
+
+    async def test_search_by_ingredient_and_difficulty(self):
+        """Test that search applies both ORM and in-memory filters"""
+        request = self._request('/search/', method='post', data={'ingredients': 'egg', 'difficulty': 'easy'})
+        response = await async_views.search_recipes(request)
+        self.assertContains(response, "Omelette")
+        self.assertNotContains(response, "Beef Stew")
+
+    async def test_search_by_cooking_time(self):
+        """Test the cooking time filter"""
+        request = self._request('/search/', method='post', data={'cooking_time': 'long'})
+        response = await async_views.search_recipes(request)
+        self.assertContains(response, "Beef Stew")
+        self.assertNotContains(response, "Omelette")
+
+    async def test_anonymous_user_redirected(self):
+        """Test that the async views still require login"""
+        response = await async_views.recipe_list(self._request('/list/', user=AnonymousUser()))
+        self.assertEqual(response.status_code, 302)
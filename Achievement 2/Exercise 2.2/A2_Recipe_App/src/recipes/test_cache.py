@@ -0,0 +1,88 @@
+"""
+Tests for the recipe view cache (recipes/cache.py)
+"""
+
+from django.test import TestCase, Client, override_settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.urls import reverse
+
+from .models import Category, Recipe
+
+
+class RecipeViewCacheTest(TestCase):
+    """Test shared and per-user caching of the protected recipe views"""
+
+    def setUp(self):
+        """Set up two users and a recipe"""
+        cache.clear()
+        self.alice = User.objects.create_user(username='alice', password='testpass123')
+        self.bob = User.objects.create_user(username='bob', password='testpass123')
+        self.category = Category.objects.create(name="Italian")
+        self.recipe = Recipe.objects.create(
+            name="Pasta",
+            cooking_time=20,
+            user=self.alice,
+            category=self.category
+        )
+        self.alice_client = Client()
+        self.alice_client.login(username='alice', password='testpass123')
+        self.bob_client = Client()
+        self.bob_client.login(username='bob', password='testpass123')
+
+    def test_recipe_list_shared_across_users(self):
+        """Test that a list page rendered for one user is served to another"""
+        first = self.alice_client.get(reverse('recipes:list'))
+        self.assertTemplateUsed(first, 'recipes/list.html')
+
+        second = self.bob_client.get(reverse('recipes:list'))
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(len(second.templates), 0)
+
+    def test_recipe_detail_invalidated_on_save(self):
+        """Test that editing a recipe invalidates the cached detail page"""
+        url = reverse('recipes:detail', args=[self.recipe.pk])
+        self.alice_client.get(url)
+
+        self.recipe.name = "Fresh Pasta"
+        self.recipe.save()
+
+        response = self.alice_client.get(url)
+        self.assertTemplateUsed(response, 'recipes/detail.html')
+        self.assertContains(response, "Fresh Pasta")
+
+    def test_search_page_cached_per_user(self):
+        """Test that the search form (which embeds a CSRF token) is not shared"""
+        url = reverse('recipes:search')
+        # First request issues the CSRF cookie, second one is cached
+        self.alice_client.get(url)
+        self.alice_client.get(url)
+
+        response = self.alice_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.templates), 0)
+
+        self.bob_client.get(url)
+        response = self.bob_client.get(url)
+        self.assertTemplateUsed(response, 'recipes/search.html')
+
+    def test_search_post_not_cached(self):
+        """Test that search submissions always run the query"""
+        url = reverse('recipes:search')
+        self.alice_client.post(url, {'recipe_name': 'Pasta'})
+        response = self.alice_client.post(url, {'recipe_name': 'Pasta'})
+        self.assertTemplateUsed(response, 'recipes/search.html')
+
+    def test_anonymous_user_redirected_before_cache(self):
+        """Test that cached pages are never served to anonymous users"""
+        self.alice_client.get(reverse('recipes:list'))
+        response = Client().get(reverse('recipes:list'))
+        self.assertEqual(response.status_code, 302)
+
+    @override_settings(RECIPE_VIEW_CACHE_TIMEOUT=0)
+    def test_cache_disabled_with_zero_timeout(self):
+        """Test that a zero timeout disables view caching"""
+        self.alice_client.get(reverse('recipes:list'))
+        response = self.bob_client.get(reverse('recipes:list'))
+        self.assertTemplateUsed(response, 'recipes/list.html')
@@ -0,0 +1,85 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import TestCase
+
+from .cache import get_generation
+from .models import Recipe
+from ingredients.models import RecipeIngredient
+
+
+class GenerateCatalogCommandTest(TestCase):
+    """Test the synthetic catalog generator"""
+
+    def setUp(self):
+        """Clear the cache so the view generation starts fresh"""
+        cache.clear()
+
+    def generate(self, **options):
+        options = {'recipes': 300, 'ingredients': 100, 'users': 10, 'categories': 8, 'batch_size': 128, **options}
+        call_command('generate_catalog', stdout=StringIO(), **options)
+
+    def test_counts_and_links(self):
+        """Test that every recipe gets between 1 and 15 distinct ingredients"""
+        self.generate()
+        self.assertEqual(Recipe.objects.count(), 300)
+        counts = Recipe.objects.annotate(n=Count('recipeingredient')).values_list('n', flat=True)
+        self.assertTrue(all(1 <= n <= 15 for n in counts))
+
+    def test_difficulty_precomputed(self):
+        """Test that stored difficulty matches the model's rule"""
+        self.generate()
+        for recipe in Recipe.objects.annotate(num_ingredients=Count('recipeingredient')):
+            self.assertEqual(recipe.difficulty, Recipe.difficulty_for(recipe.cooking_time, recipe.num_ingredients))
+
+    def test_ingredient_popularity_is_skewed(self):
+        """Test that the most popular ingredient is far more common than the median"""
+        self.generate()
+        usage = sorted(
+            RecipeIngredient.objects.values('ingredient').annotate(n=Count('id')).values_list('n', flat=True),
+            reverse=True,
+        )
+        self.assertGreater(usage[0], 10 * usage[len(usage) // 2])
+
+    def test_seed_is_reproducible(self):
+        """Test that the same seed produces the same catalog"""
+        self.generate(seed=7)
+        first = list(Recipe.objects.order_by('pk').values_list('name', 'cooking_time', 'difficulty'))
+        Recipe.objects.all().delete()
+        self.generate(seed=7)
+        second = list(Recipe.objects.order_by('pk').values_list('name', 'cooking_time', 'difficulty'))
+        self.assertEqual(first, second)
+
+    def test_invalidates_view_cache(self):
+        """Test that bulk inserts still bump the cached view generation"""
+        before = get_generation()
+        self.generate(recipes=5)
+        self.assertNotEqual(get_generation(), before)
+
+    def test_rejects_small_vocabulary(self):
+        """Test that the vocabulary must cover the largest ingredient list"""
+        with self.assertRaises(CommandError):
+            self.generate(ingredients=10)
+
+    def test_database_assigns_ids(self):
+        """Test that generated recipes take ids from the sequence, so later inserts do not collide"""
+        self.generate(recipes=20)
+        self.assertEqual(RecipeIngredient.objects.exclude(recipe__in=Recipe.objects.all()).count(), 0)
+        user = User.objects.create_user(username='cook', password='testpassword')
+        recipe = Recipe.objects.create(name="After the catalog", cooking_time=5, user=user)
+        self.assertGreater(recipe.pk, Recipe.objects.exclude(pk=recipe.pk).order_by('-pk').first().pk)
+
+    def test_numbered_ids_reset_sequence(self):
+        """Test the fallback for databases whose bulk inserts return no ids"""
+        with mock.patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False):
+            self.generate(recipes=20)
+        self.assertEqual(RecipeIngredient.objects.exclude(recipe__in=Recipe.objects.all()).count(), 0)
+        user = User.objects.create_user(username='cook', password='testpassword')
+        recipe = Recipe.objects.create(name="After the catalog", cooking_time=5, user=user)
+        self.assertGreater(recipe.pk, Recipe.objects.exclude(pk=recipe.pk).order_by('-pk').first().pk)
@@ -0,0 +1,181 @@
+"""
+Query-count regression tests for the recipe views.
+
+Each test seeds the catalog at 10, 100 and 1000 recipes and checks that the
+view runs the same number of SQL queries at every size. When it does not, the
+failure message shows a diff of the normalized SQL between the smallest and
+the offending size, which points straight at the N+1 query.
+"""
+
+import difflib
+import re
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .models import Category, Recipe
+from .paginator import EstimatedCountPaginator
+from ingredients.models import Ingredient, RecipeIngredient
+
+CATALOG_SIZES = (10, 100, 1000)
+INGREDIENTS_PER_RECIPE = 4
+
+
+def normalize_sql(sql):
+    """Strip literal values so the same query at different sizes compares equal"""
+    sql = re.sub(r"'(?:[^']|'')*'", '?', sql)
+    sql = re.sub(r'\b\d+(\.\d+)?\b', '?', sql)
+    sql = re.sub(r'IN \((\?(, )?)+\)', 'IN (...)', sql)
+    return sql
+
+
+@override_settings(RECIPE_VIEW_CACHE_TIMEOUT=0)
+class ViewQueryCountTest(TestCase):
+    """Test that every recipe view runs a constant number of queries"""
+
+    def setUp(self):
+        """Set up a logged-in user and an ingredient vocabulary"""
+        self.user = User.objects.create_user(username='perfuser', password='perfpass123')
+        self.categories = [
+            Category.objects.create(name=f"Category {i}") for i in range(5)
+        ]
+        self.ingredients = Ingredient.objects.bulk_create(
+            Ingredient(name=f"Ingredient {i}") for i in range(50)
+        )
+        self.seeded = 0
+        self.client = Client()
+        self.client.login(username='perfuser', password='perfpass123')
+
+    def seed_to(self, size):
+        """Grow the catalog to ``size`` recipes, each with a few ingredients"""
+        recipes = Recipe.objects.bulk_create(
+            Recipe(
+                name=f"Recipe {i}",
+                cooking_time=5 + (i * 13) % 120,
+                difficulty='Medium',
+                user=self.user,
+                category=self.categories[i % len(self.categories)] if i % 7 else None,
+            )
+            for i in range(self.seeded, size)
+        )
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(
+                recipe=recipe,
+                ingredient=self.ingredients[(recipe.pk + offset) % len(self.ingredients)],
+                quantity=offset or None,
+            )
+            for recipe in recipes
+            for offset in range(INGREDIENTS_PER_RECIPE)
+        )
+        self.seeded = size
+
+    def capture(self, method, url, data=None):
+        # Warm the session and user caches so only the view's own work is measured
+        getattr(self.client, method)(url, data or {})
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url, data or {})
+        self.assertEqual(response.status_code, 200)
+        return [normalize_sql(query['sql']) for query in queries.captured_queries]
+
+    def assertConstantQueries(self, url, method='get', data=None, sizes=CATALOG_SIZES):
+        """Assert the view's query count does not grow with the catalog size"""
+        baseline = None
+        for size in sizes:
+            self.seed_to(size)
+            queries = self.capture(method, url() if callable(url) else url, data)
+            if baseline is None:
+                baseline = (size, queries)
+                continue
+            if len(queries) != len(baseline[1]):
+                diff = '\n'.join(difflib.unified_diff(
+                    baseline[1], queries,
+                    fromfile=f'{baseline[0]} recipes ({len(baseline[1])} queries)',
+                    tofile=f'{size} recipes ({len(queries)} queries)',
+                    lineterm='',
+                ))
+                self.fail(f"Query count grows with catalog size:\n{diff}")
+
+    def test_home(self):
+        self.assertConstantQueries(reverse('recipes:home'))
+
+    def test_recipe_list(self):
+        self.assertConstantQueries(reverse('recipes:list'))
+
+    def test_recipe_detail(self):
+        self.assertConstantQueries(
+            lambda: reverse('recipes:detail', args=[Recipe.objects.order_by('pk').values_list('pk', flat=True).last()])
+        )
+
+    def test_search_form(self):
+        self.assertConstantQueries(reverse('recipes:search'))
+
+    def test_search_show_all(self):
+        self.assertConstantQueries(reverse('recipes:search') + '?show_all=1')
+
+    def test_search_by_name(self):
+        self.assertConstantQueries(reverse('recipes:search'), method='post', data={'recipe_name': 'Recipe 1'})
+
+    def test_search_by_ingredient(self):
+        self.assertConstantQueries(reverse('recipes:search'), method='post', data={'ingredients': 'Ingredient 1'})
+
+    def test_search_by_difficulty(self):
+        self.assertConstantQueries(reverse('recipes:search'), method='post', data={'difficulty': 'medium'})
+
+    def test_search_by_cooking_time(self):
+        self.assertConstantQueries(reverse('recipes:search'), method='post', data={'cooking_time': 'quick'})
+
+    def test_admin_recipe_changelist(self):
+        self.user.is_staff = self.user.is_superuser = True
+        self.user.save()
+        self.assertConstantQueries(reverse('admin:recipes_recipe_changelist'))
+
+    def test_admin_recipe_changelist_filtered(self):
+        self.user.is_staff = self.user.is_superuser = True
+        self.user.save()
+        url = reverse('admin:recipes_recipe_changelist')
+        self.assertConstantQueries(lambda: f'{url}?category__id__exact={self.categories[0].pk}')
+
+    @patch('matplotlib.pyplot.savefig')
+    @patch('matplotlib.pyplot.tight_layout')
+    def test_analytics(self, mock_tight_layout, mock_savefig):
+        # Chart layout and PNG encoding dominate at 1000 recipes and run no SQL
+        self.assertConstantQueries(reverse('recipes:analytics'))
+
+
+class EstimatedCountPaginatorTest(TestCase):
+    """Test the admin paginator's row estimate"""
+
+    def setUp(self):
+        """Set up a handful of recipes"""
+        user = User.objects.create_user(username='perfuser', password='perfpass123')
+        Recipe.objects.bulk_create(Recipe(name=f"Recipe {i}", cooking_time=10, user=user) for i in range(30))
+
+    def test_small_table_counts_exactly(self):
+        """Test that tables under the limit still get an exact count"""
+        Recipe.objects.filter(pk__in=Recipe.objects.values('pk')[:5]).delete()
+        self.assertEqual(EstimatedCountPaginator(Recipe.objects.all(), 10).count, 25)
+
+    @patch.object(EstimatedCountPaginator, 'exact_count_limit', 10)
+    def test_large_table_uses_estimate(self):
+        """Test that the estimate is used without running COUNT(*)"""
+        with CaptureQueriesContext(connection) as queries:
+            count = EstimatedCountPaginator(Recipe.objects.all(), 10).count
+        self.assertEqual(count, Recipe.objects.order_by('-pk').values_list('pk', flat=True).first())
+        self.assertNotIn('COUNT(', queries.captured_queries[0]['sql'])
+
+    @patch.object(EstimatedCountPaginator, 'exact_count_limit', 10)
+    def test_filtered_queryset_counts_exactly(self):
+        """Test that filtered changelists are counted exactly"""
+        self.assertEqual(EstimatedCountPaginator(Recipe.objects.filter(name__endswith='1'), 10).count, 3)
+
+
+class NormalizeSQLTest(TestCase):
+    """Test SQL normalization used for query diffs"""
+
+    def test_normalize_sql(self):
+        sql = "SELECT * FROM t WHERE name = 'egg' AND id IN (1, 2, 3) LIMIT 21"
+        self.assertEqual(normalize_sql(sql), "SELECT * FROM t WHERE name = ? AND id IN (...) LIMIT ?")
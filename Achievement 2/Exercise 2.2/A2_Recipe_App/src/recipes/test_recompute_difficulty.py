@@ -0,0 +1,100 @@
+from io import StringIO
+
+from django.contrib.admin import helpers
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .cache import get_generation
+from .models import Recipe
+from ingredients.models import Ingredient, RecipeIngredient
+
+
+class RecomputeDifficultyTest(TestCase):
+    """Test set-based difficulty recomputation"""
+
+    def setUp(self):
+        """Set up recipes on each side of every difficulty boundary, all marked stale"""
+        cache.clear()
+        self.user = User.objects.create_superuser(username='admin', password='adminpass123')
+        ingredients = Ingredient.objects.bulk_create(Ingredient(name=f"Ingredient {i}") for i in range(12))
+        self.cases = [
+            # (cooking_time, ingredient_count, expected)
+            (29, 5, 'Easy'), (30, 5, 'Medium'), (29, 6, 'Medium'), (0, 0, 'Easy'),
+            (60, 10, 'Medium'), (61, 10, 'Hard'), (60, 11, 'Hard'), (120, 0, 'Hard'),
+        ]
+        self.recipes = Recipe.objects.bulk_create(
+            Recipe(name=f"Recipe {i}", cooking_time=cooking_time, difficulty='Stale', user=self.user)
+            for i, (cooking_time, _, _) in enumerate(self.cases)
+        )
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(recipe=recipe, ingredient=ingredient)
+            for recipe, (_, count, _) in zip(self.recipes, self.cases)
+            for ingredient in ingredients[:count]
+        )
+
+    def assertRecomputed(self, recipes=None):
+        for recipe, (_, _, expected) in zip(recipes or self.recipes, self.cases):
+            recipe.refresh_from_db()
+            self.assertEqual(recipe.difficulty, expected, f"{recipe.cooking_time} min")
+
+    def test_matches_difficulty_for(self):
+        """Test that the SQL CASE agrees with Recipe.difficulty_for at every boundary"""
+        self.assertEqual(Recipe.objects.recompute_difficulty(), len(self.cases))
+        self.assertRecomputed()
+        for cooking_time, count, expected in self.cases:
+            self.assertEqual(Recipe.difficulty_for(cooking_time, count), expected)
+
+    def test_one_update_per_chunk(self):
+        """Test that each id-range chunk is a single UPDATE statement"""
+        progress = []
+        with CaptureQueriesContext(connection) as queries:
+            Recipe.objects.recompute_difficulty(chunk_size=3, progress=lambda done, total: progress.append(done))
+        updates = [query for query in queries.captured_queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 3)
+        self.assertEqual(progress, [3, 6, 8])
+        self.assertRecomputed()
+
+    def test_only_selected_rows_updated(self):
+        """Test that a filtered queryset leaves other recipes alone"""
+        Recipe.objects.filter(pk=self.recipes[0].pk).recompute_difficulty()
+        self.assertEqual(Recipe.objects.get(pk=self.recipes[0].pk).difficulty, 'Easy')
+        self.assertEqual(Recipe.objects.filter(difficulty='Stale').count(), len(self.cases) - 1)
+
+    def test_empty_queryset(self):
+        """Test that an empty selection runs no UPDATE"""
+        self.assertEqual(Recipe.objects.none().recompute_difficulty(), 0)
+
+    def test_management_command(self):
+        """Test manage.py recompute_difficulty updates the table and invalidates cached pages"""
+        before = get_generation()
+        out = StringIO()
+        call_command('recompute_difficulty', chunk_size=5, stdout=out)
+        self.assertIn(f"Recomputed difficulty for {len(self.cases)} recipes", out.getvalue())
+        self.assertNotEqual(get_generation(), before)
+        self.assertRecomputed()
+
+    def test_admin_action_selected(self):
+        """Test the admin action for selected recipes"""
+        client = Client()
+        client.login(username='admin', password='adminpass123')
+        response = client.post(reverse('admin:recipes_recipe_changelist'), {
+            'action': 'recompute_difficulty_selected',
+            helpers.ACTION_CHECKBOX_NAME: [self.recipes[1].pk, self.recipes[5].pk],
+        }, follow=True)
+        self.assertContains(response, "Recomputed difficulty for 2 recipes.")
+        self.assertEqual(Recipe.objects.filter(difficulty='Stale').count(), len(self.cases) - 2)
+
+    def test_admin_action_all(self):
+        """Test the admin action that recomputes the whole table"""
+        client = Client()
+        client.login(username='admin', password='adminpass123')
+        client.post(reverse('admin:recipes_recipe_changelist'), {
+            'action': 'recompute_difficulty_all',
+            helpers.ACTION_CHECKBOX_NAME: [self.recipes[0].pk],
+        })
+        self.assertRecomputed()
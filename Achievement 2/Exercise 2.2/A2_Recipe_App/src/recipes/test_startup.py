@@ -0,0 +1,68 @@
+"""
+Startup-time tests: importing the URLconf must stay cheap
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from .management.commands.startup_profile import parse_importtime
+
+# Seconds allowed for django.setup() plus importing the URLconf in a fresh process
+URLCONF_IMPORT_BUDGET = float(os.environ.get('URLCONF_IMPORT_BUDGET', 2.0))
+
+IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import django
+django.setup()
+import {urlconf}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    'elapsed': elapsed,
+    'heavy': [name for name in ('pandas', 'matplotlib') if name in sys.modules],
+}}))
+"""
+
+
+class URLConfImportTest(SimpleTestCase):
+    """Test that importing the project URLconf is fast and lightweight"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE='recipe_project.settings')
+        result = subprocess.run(
+            [sys.executable, '-c', IMPORT_SCRIPT.format(urlconf=settings.ROOT_URLCONF)],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=True,
+        )
+        cls.report = json.loads(result.stdout.strip().splitlines()[-1])
+
+    def test_heavy_dependencies_not_imported(self):
+        """Test that pandas and matplotlib are loaded lazily"""
+        self.assertEqual(self.report['heavy'], [])
+
+    def test_urlconf_import_within_budget(self):
+        """Test that startup stays within the time budget"""
+        self.assertLess(
+            self.report['elapsed'], URLCONF_IMPORT_BUDGET,
+            f"Importing {settings.ROOT_URLCONF} took {self.report['elapsed']:.2f}s "
+            f"(budget {URLCONF_IMPORT_BUDGET:.2f}s); run 'manage.py startup_profile' to see why"
+        )
+
+
+class ParseImportTimeTest(SimpleTestCase):
+    """Test parsing of -X importtime output"""
+
+    def test_parse_importtime(self):
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   _io\n"
+            "import time:      2440 |       2691 | recipes.views\n"
+            "unrelated line\n"
+        )
+        self.assertEqual(parse_importtime(output), [('_io', 120, 120), ('recipes.views', 2440, 2691)])
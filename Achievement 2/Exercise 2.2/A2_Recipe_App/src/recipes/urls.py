@@ -1,14 +1,21 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
 app_name = 'recipes'
 
+# Under ASGI the list, detail and search pages can be served by async views
+if getattr(settings, 'RECIPE_ASYNC_VIEWS', False):
+    from . import async_views as recipe_views
+else:
+    recipe_views = views
+
 urlpatterns = [
     path('', views.home, name='home'),  # Welcome page at root
     path('login/', views.login_view, name='login'),  # Login page
     path('logout/', views.logout_view, name='logout'),  # Logout page
-    path('list/', views.recipe_list, name='list'),  # Recipe list at /list/ (protected)
-    path('recipe/<int:pk>/', views.recipe_detail, name='detail'),  # Recipe detail at /recipe/id/ (protected)
-    path('search/', views.search_recipes, name='search'),  # Recipe search page (protected)
+    path('list/', recipe_views.recipe_list, name='list'),  # Recipe list at /list/ (protected)
+    path('recipe/<int:pk>/', recipe_views.recipe_detail, name='detail'),  # Recipe detail at /recipe/id/ (protected)
+    path('search/', recipe_views.search_recipes, name='search'),  # Recipe search page (protected)
     path('analytics/', views.analytics_view, name='analytics'),  # Analytics page (protected)
-]
\ No newline at end of file
+]
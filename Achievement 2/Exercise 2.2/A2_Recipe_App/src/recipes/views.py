@@ -2,12 +2,10 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Q
+from django.db.models import Count, Q
 from .models import Recipe
-import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib
-matplotlib.use('Agg')  # Use non-GUI backend
+from .cache import cache_recipe_view
+from . import heavy
 import io
 import base64
 
@@ -38,15 +36,20 @@ def logout_view(request):
     return render(request, 'recipes/success.html')
 
 @login_required
+@cache_recipe_view()
 def recipe_list(request):
     """Display all recipes with their ingredients - Protected view"""
     recipes = Recipe.objects.all().select_related('category', 'user').prefetch_related('recipeingredient_set__ingredient')
     return render(request, 'recipes/list.html', {'recipes': recipes})
 
 @login_required
+@cache_recipe_view()
 def recipe_detail(request, pk):
     """Display detailed view of a single recipe - Protected view"""
-    recipe = get_object_or_404(Recipe, pk=pk)
+    recipe = get_object_or_404(
+        Recipe.objects.select_related('category', 'user').prefetch_related('recipeingredient_set__ingredient'),
+        pk=pk
+    )
     # Recalculate difficulty to ensure it's current
     calculated_difficulty = recipe.calculate_difficulty()
     
@@ -58,8 +61,10 @@ def recipe_detail(request, pk):
     return render(request, 'recipes/detail.html', context)
 
 @login_required
+@cache_recipe_view(vary_on_user=True)
 def search_recipes(request):
     """Search recipes with multiple criteria"""
+    pd = heavy.pandas()
     recipes_df = pd.DataFrame()
     search_performed = False
     
@@ -132,9 +137,11 @@ def search_recipes(request):
 @login_required
 def analytics_view(request):
     """Display data analytics with charts"""
+    pd = heavy.pandas()
+    plt = heavy.pyplot()
     
-    # Get all recipes for analysis
-    recipes = Recipe.objects.all()
+    # Get all recipes for analysis, with category and ingredient count in the same query
+    recipes = Recipe.objects.select_related('category').annotate(num_ingredients=Count('recipeingredient'))
     
     # Convert to DataFrame
     recipe_data = []
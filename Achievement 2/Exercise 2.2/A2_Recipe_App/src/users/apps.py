@@ -1,6 +1,18 @@
 from django.apps import AppConfig
+from django.contrib.auth.signals import user_logged_out
+from django.db.models.signals import post_save, post_delete
 
 
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+
+    def ready(self):
+        # Keep the cached authenticated user in sync with the database
+        from django.contrib.auth.models import User
+        from .middleware import clear_cached_user_on_logout, clear_cached_user_on_save
+
+        user_logged_out.connect(clear_cached_user_on_logout, dispatch_uid='users_cache_logout')
+        for model in (User, self.get_model('UserProfile')):
+            post_save.connect(clear_cached_user_on_save, sender=model, dispatch_uid=f'users_cache_save_{model.__name__}')
+            post_delete.connect(clear_cached_user_on_save, sender=model, dispatch_uid=f'users_cache_delete_{model.__name__}')
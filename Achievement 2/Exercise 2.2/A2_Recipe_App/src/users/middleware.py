@@ -0,0 +1,172 @@
+"""
+Authentication middleware that caches the logged-in user per session.
+
+Django's AuthenticationMiddleware loads the ``User`` from the database on
+every request. Here the user (and their ``UserProfile``) is kept in the
+default cache under the session key, so together with the ``cached_db``
+session engine an authenticated page view costs no auth queries once warm.
+
+Only the user's field values are cached, never the password hash: the entry
+holds the session auth hash to verify the session against instead, and the
+user is rebuilt with ``password`` deferred, as ``defer('password')`` would
+load it. Cached entries carry a per-user generation number that is bumped
+whenever the user or their profile is saved (password changes included), and
+the session's own entry is dropped on logout.
+
+Invalidation only reaches processes that share the cache. With a per-process
+backend (``locmem``, ``dummy``) a password change or logout in one worker
+would leave the others serving the old user, so the middleware then behaves
+exactly like ``AuthenticationMiddleware`` unless ``AUTH_USER_CACHE_PROCESS_LOCAL``
+is set, which is only safe when a single process serves every request.
+"""
+
+import time
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth import get_user_model
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+
+SESSION_KEY_PREFIX = 'users:auth:session'
+GENERATION_KEY_PREFIX = 'users:auth:generation'
+
+
+def session_cache_key(session_key):
+    return f"{SESSION_KEY_PREFIX}:{session_key}"
+
+
+def generation_cache_key(user_id):
+    return f"{GENERATION_KEY_PREFIX}:{user_id}"
+
+
+def user_cache_enabled():
+    """Whether cached users can be invalidated in every process serving requests"""
+    if getattr(settings, 'AUTH_USER_CACHE_PROCESS_LOCAL', False):
+        return True
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+def user_fields(user):
+    """The field values of a user worth caching: every concrete field but the password"""
+    return {
+        field.attname: getattr(user, field.attname)
+        for field in user._meta.concrete_fields
+        if field.attname != 'password'
+    }
+
+
+def user_from_fields(fields, db):
+    """Rebuild a user from cached field values, with the password deferred"""
+    return get_user_model().from_db(db, list(fields), list(fields.values()))
+
+
+def invalidate_user(user_id):
+    """Invalidate every cached session entry for the given user"""
+    try:
+        cache.incr(generation_cache_key(user_id))
+    except ValueError:
+        cache.set(generation_cache_key(user_id), time.time_ns(), None)
+
+
+def invalidate_session(session_key):
+    """Drop the cached user for a single session"""
+    if session_key:
+        cache.delete(session_cache_key(session_key))
+
+
+def load_cached_user(request):
+    """Return the user for this request, from the cache when possible"""
+    session_key = request.session.session_key
+    user_id = request.session.get(auth.SESSION_KEY)
+    if not session_key or user_id is None:
+        return auth.get_user(request)
+
+    entry_key = session_cache_key(session_key)
+    generation_key = generation_cache_key(user_id)
+    cached = cache.get_many([entry_key, generation_key])
+    generation = cached.get(generation_key)
+    entry = cached.get(entry_key)
+
+    if generation is None:
+        # Generation was evicted: start a new one so older entries are stale
+        cache.add(generation_key, time.time_ns(), None)
+        generation = cache.get(generation_key)
+        entry = None
+
+    if entry is not None:
+        cached_generation, db, fields, auth_hash, profile = entry
+        session_hash = request.session.get(auth.HASH_SESSION_KEY)
+        if (
+            cached_generation == generation
+            and str(fields[get_user_model()._meta.pk.attname]) == str(user_id)
+            and session_hash
+            and constant_time_compare(session_hash, auth_hash)
+        ):
+            user = user_from_fields(fields, db)
+            _attach_profile(user, profile)
+            return user
+
+    # Cache miss or stale entry: let Django load and verify the user
+    user = auth.get_user(request)
+    if user.is_authenticated and request.session.session_key == session_key:
+        profile = _load_profile(user)
+        cache.set(
+            entry_key,
+            (generation, user._state.db, user_fields(user), user.get_session_auth_hash(), profile),
+            getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 300),
+        )
+        _attach_profile(user, profile)
+    return user
+
+
+def _load_profile(user):
+    from .models import UserProfile
+    return UserProfile.objects.filter(user=user).first()
+
+
+def _attach_profile(user, profile):
+    # Prime the reverse one-to-one cache so user.userprofile needs no query;
+    # a cached None makes the accessor raise DoesNotExist as usual.
+    user._state.fields_cache['userprofile'] = profile
+
+
+def get_user(request):
+    if not hasattr(request, '_cached_user'):
+        request._cached_user = load_cached_user(request)
+    return request._cached_user
+
+
+async def auser(request):
+    if not hasattr(request, '_acached_user'):
+        request._acached_user = await sync_to_async(get_user)(request)
+    return request._acached_user
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """Drop-in replacement for AuthenticationMiddleware backed by the cache"""
+
+    def process_request(self, request):
+        super().process_request(request)
+        if not user_cache_enabled():
+            return
+        request.user = SimpleLazyObject(lambda: get_user(request))
+        request.auser = partial(auser, request)
+
+
+def clear_cached_user_on_logout(sender, request, user, **kwargs):
+    if request is not None and hasattr(request, 'session'):
+        invalidate_session(request.session.session_key)
+
+
+def clear_cached_user_on_save(sender, instance, **kwargs):
+    user_id = getattr(instance, 'user_id', instance.pk)
+    if user_id is not None:
+        invalidate_user(user_id)
+
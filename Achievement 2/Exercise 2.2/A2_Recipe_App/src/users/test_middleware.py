@@ -0,0 +1,83 @@
+from django.test import TestCase, Client, override_settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.urls import reverse
+
+from recipes.models import Recipe
+from .middleware import session_cache_key
+from .models import UserProfile
+
+
+@override_settings(AUTH_USER_CACHE_PROCESS_LOCAL=True)
+class CachedAuthenticationMiddlewareTest(TestCase):
+    """Test the per-session user cache in users/middleware.py"""
+
+    def setUp(self):
+        """Set up a logged-in user with a profile"""
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.profile = UserProfile.objects.create(user=self.user, location="Paris")
+        self.recipe = Recipe.objects.create(name="Toast", cooking_time=5, user=self.user)
+        self.client = Client()
+        self.client.login(username='testuser', password='testpassword')
+        self.url = reverse('recipes:detail', args=[self.recipe.pk])
+
+    def test_warm_request_makes_no_queries(self):
+        """Test that a cached page for a cached session costs zero queries"""
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_profile_is_cached_with_user(self):
+        """Test that the user's profile is available without a query"""
+        response = self.client.get(self.url)
+        user = response.wsgi_request.user
+        with self.assertNumQueries(0):
+            self.assertEqual(user.userprofile.location, "Paris")
+
+    def test_password_hash_not_cached(self):
+        """Test that the cache holds no password hash and the cached user defers it"""
+        self.client.get(self.url)
+        session_key = self.client.session.session_key
+        self.assertNotIn(self.user.password, repr(cache.get(session_cache_key(session_key))))
+
+        response = self.client.get(self.url)
+        user = response.wsgi_request.user
+        self.assertIn('password', user.get_deferred_fields())
+        self.assertTrue(user.check_password('testpassword'))
+
+    def test_password_change_invalidates_other_sessions(self):
+        """Test that changing the password logs out existing sessions"""
+        self.client.get(self.url)
+        self.user.set_password('newpassword')
+        self.user.save()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+
+    def test_profile_edit_invalidates_cache(self):
+        """Test that editing the profile refreshes the cached copy"""
+        self.client.get(self.url)
+        self.profile.location = "Rome"
+        self.profile.save()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.wsgi_request.user.userprofile.location, "Rome")
+
+    def test_logout_clears_cached_user(self):
+        """Test that a logged-out session is not served the cached user"""
+        self.client.get(self.url)
+        self.client.get(reverse('recipes:logout'))
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+
+    @override_settings(AUTH_USER_CACHE_PROCESS_LOCAL=False)
+    def test_process_local_cache_not_used(self):
+        """Test that a per-process cache backend never serves a cached user"""
+        self.client.get(self.url)
+        session_key = self.client.session.session_key
+        self.assertIsNone(cache.get(session_cache_key(session_key)))
+        response = self.client.get(self.url)
+        self.assertEqual(response.wsgi_request.user, self.user)